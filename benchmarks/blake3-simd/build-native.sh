@@ -0,0 +1,27 @@
+#!/usr/bin/env bash
+
+# Build the C version of BLAKE3 as native shared libraries (Linux-only): once
+# with the same SSE2 kernel the Wasm SIMD build uses, and once with only the
+# portable scalar kernel, for SimdScore's native SIMD speed-up. BLAKE3 is
+# vendored in BLAKE3/c. The SSE2 build needs an x86 host and is skipped
+# elsewhere.
+#
+# Usage: ./build-native.sh
+
+set -e
+
+ENGINE_DIR=${ENGINE_DIR:-"../../engines/native"}
+BLAKE3_DIR=BLAKE3/c
+CFLAGS=${CFLAGS:-"-O3 -fPIC -I. -I$BLAKE3_DIR -DBLAKE3_NO_SSE41 -DBLAKE3_NO_AVX2 -DBLAKE3_NO_AVX512"}
+LDFLAGS=${LDFLAGS:-"-shared -L$ENGINE_DIR"}
+SOURCES="$BLAKE3_DIR/blake3.c $BLAKE3_DIR/blake3_dispatch.c $BLAKE3_DIR/blake3_portable.c benchmark.c"
+
+(set -x; cc -Dmain=native_entry $CFLAGS -DBLAKE3_NO_SSE2 $LDFLAGS -o blake3-scalar.so $SOURCES -lengine)
+case $(uname -m) in
+    x86_64|i?86)
+        (set -x; cc -Dmain=native_entry $CFLAGS -msse2 $LDFLAGS -o blake3-simd.so $SOURCES $BLAKE3_DIR/blake3_sse2.c -lengine)
+        ;;
+    *)
+        echo "Skipping blake3-simd.so: the SSE2 build needs an x86 host, not $(uname -m)"
+        ;;
+esac
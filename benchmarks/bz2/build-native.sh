@@ -0,0 +1,11 @@
+#!/usr/bin/env bash
+
+# Build the bz2 benchmark as a native shared library (Linux-only).
+#
+# Usage: ./build-native.sh
+
+ENGINE_DIR=${ENGINE_DIR:-"../../engines/native"}
+CFLAGS=${CFLAGS:-"-O3 -fPIC -I. -Wno-attributes"}
+LDFLAGS=${LDFLAGS:-"-shared -L$ENGINE_DIR"}
+
+(set -x; cc -Dmain=native_entry $CFLAGS $LDFLAGS -o benchmark.so benchmark.c -lengine)
@@ -8,23 +8,48 @@ import argparse
 import subprocess
 import textwrap
 import logging
-import pandas as pd
-import numpy as np
-from termcolor import colored
-import yaml
+import threading
+import queue
+import collections
+import socket
+import socketserver
+import re
+import shlex
+import concurrent.futures
+import hashlib
+import shutil
+import functools
+import itertools
+import json
+import platform
+import glob
+import time
+import signal
+import sqlite3
+import uuid
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
 
 # Command line options
 parser = argparse.ArgumentParser(
     formatter_class=argparse.RawDescriptionHelpFormatter,
-    epilog=textwrap.dedent(
-        """
-            available engines:      Wasmtime (default), Native
+    epilog=textwrap.dedent("""
+            available engines:      Wasmtime (default), Native, see --engines
             available benchmarks:   See list
             available suites:       See list
-            available tests:        WasmScore (default), SimdScore
+            available tests:        WasmScore (default), SimdScore, ColdStart
 
-         """
-    ),
+         """),
 )
 
 parser.add_argument("-b", "--benchmarks", nargs="+", help="Benchmarks to run")
@@ -96,24 +121,519 @@ parser.add_argument(
     help="Check the build version",
 )
 
+parser.add_argument(
+    "--build-cache-dir",
+    default="/sightglass/build-cache",
+    help="Directory caching native benchmark builds. Default=/sightglass/build-cache",
+)
+
+parser.add_argument(
+    "--build-cache-size",
+    type=int,
+    default=2048,
+    help="Size limit of the native build cache in MB, oldest entries are evicted first. Default=2048",
+)
+
+parser.add_argument(
+    "--no-build-cache",
+    action="store_true",
+    help="Always rebuild native benchmarks instead of reusing cached builds",
+)
+
+parser.add_argument(
+    "-f",
+    "--force",
+    action="store_true",
+    help="Re-measure all benchmarks instead of reusing cached results",
+)
+
+parser.add_argument(
+    "--result-cache-size",
+    type=positive_int,
+    default=512,
+    help="Size limit of the result cache in MB, least recently used results are evicted first. Default=512",
+)
+
+parser.add_argument(
+    "--clear-cache",
+    action="store_true",
+    help="Remove all cached benchmark results and exit",
+)
+
+parser.add_argument(
+    "--statistic",
+    choices=["mean", "median"],
+    default="mean",
+    help="Statistic of each benchmark's samples that efficiencies and scores are based on (default: mean)",
+)
+
+parser.add_argument(
+    "--cv-threshold",
+    type=float,
+    default=0.05,
+    help="Coefficient of variation above which a benchmark result is flagged as noisy (default: 0.05)",
+)
+
+parser.add_argument(
+    "--metric",
+    choices=["nanoseconds", "cycles"],
+    default="nanoseconds",
+    help="Measurement the results and scores are based on. cycles is independent of clock frequency scaling (default: nanoseconds)",
+)
+
+parser.add_argument(
+    "--memory",
+    action="store_true",
+    help="Also measure peak RSS, page faults and peak virtual memory of each run and report a memory efficiency score",
+)
+
+parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Also record each benchmark under perf with JIT profiling, writing collapsed stacks, a flame graph and a hot function table per engine",
+)
+
+parser.add_argument(
+    "--profile-strategy",
+    choices=["perfmap", "jitdump"],
+    default="perfmap",
+    help="How the Wasm engine exposes JIT code to perf (default: perfmap)",
+)
+
+parser.add_argument(
+    "--profile-top",
+    type=positive_int,
+    default=20,
+    help="Number of hot functions reported per benchmark with --profile (default: 20)",
+)
+
+parser.add_argument(
+    "--coldstart-iterations",
+    type=positive_int,
+    default=2000,
+    metavar="N",
+    help="Starts of each module in the ColdStart test (default: 2000)",
+)
+
+parser.add_argument(
+    "--throughput",
+    action="store_true",
+    help="Also run 1, 2, 4 ... concurrent instances of each benchmark and report executions/s, latency degradation and scaling efficiency",
+)
+
+parser.add_argument(
+    "--throughput-max",
+    type=positive_int,
+    metavar="K",
+    help="Most concurrent instances in throughput mode (default: number of available cores)",
+)
+
+parser.add_argument(
+    "--scaling",
+    nargs="+",
+    metavar="BENCHMARK",
+    help="Run benchmarks that read an input file over a series of input sizes and fit their Execution time against the size",
+)
+
+parser.add_argument(
+    "--scaling-sizes",
+    nargs="+",
+    default=["4K", "16K", "64K", "256K", "1M"],
+    metavar="SIZE|FILE",
+    help="Input sizes in bytes (K and M suffixes allowed), generated by repeating the benchmark's own input, or input files to use as they are (default: 4K 16K 64K 256K 1M)",
+)
+
+parser.add_argument(
+    "--perf-counters",
+    action="store_true",
+    help="Also collect perf_event counters per phase (sightglass perf-counters measure) and report IPC and misses per kilo-instruction",
+)
+
+parser.add_argument(
+    "--adaptive",
+    action="store_true",
+    help="Sample each benchmark until its Execution mean converges instead of a fixed process count",
+)
+
+parser.add_argument(
+    "--ci-width",
+    type=float,
+    default=0.02,
+    help="Adaptive mode target width of the 95%% confidence interval relative to the mean. Default=0.02",
+)
+
+parser.add_argument(
+    "--adaptive-budget",
+    type=float,
+    default=120,
+    help="Adaptive mode time budget per benchmark and engine in seconds. Default=120",
+)
+
+parser.add_argument(
+    "--compare",
+    nargs=2,
+    metavar=("BASELINE", "CANDIDATE"),
+    help="Compare two result sets (dumpfiles, raw sightglass CSVs or results folders) instead of running benchmarks",
+)
+
+parser.add_argument(
+    "--history-db",
+    default="/sightglass/results/history.db",
+    help="SQLite database every run's results are appended to. Default=/sightglass/results/history.db",
+)
+
+parser.add_argument(
+    "--no-history",
+    action="store_true",
+    help="Do not append this run's results to the history database",
+)
+
+parser.add_argument(
+    "--history",
+    nargs="+",
+    metavar="BENCHMARK",
+    help="Print the stored trend of the given benchmark(s) instead of running benchmarks",
+)
+
+parser.add_argument(
+    "--history-phase",
+    default="Execution",
+    help="Phase shown by --history. Default=Execution",
+)
+
+parser.add_argument(
+    "--history-runs",
+    type=positive_int,
+    default=90,
+    help="Number of most recent runs shown by --history. Default=90",
+)
+
+parser.add_argument(
+    "--history-export",
+    metavar="FILE",
+    help="Export the history database to a .csv or .parquet file instead of running benchmarks",
+)
+
+parser.add_argument(
+    "-e",
+    "--engines",
+    nargs="+",
+    metavar="LABEL=PATH",
+    help="Wasm engines (libengine.so builds) to benchmark side by side, e.g. main=/engines/main/libengine.so",
+)
+
+parser.add_argument(
+    "--engines-config",
+    metavar="FILE",
+    help="YAML file mapping Wasm engine labels to libengine.so paths, combined with --engines",
+)
+
+parser.add_argument(
+    "--sweep",
+    metavar="FILE",
+    help="YAML matrix of engine settings (bench-api engine flags); runs the suites once per combination and ranks them",
+)
+
+parser.add_argument(
+    "--resume",
+    metavar="RUN_ID",
+    help="Resume an interrupted or failed run, reusing the benchmarks its journal records as done. Journals of runs that completed are removed",
+)
+
+parser.add_argument(
+    "--stream",
+    metavar="FILE",
+    help="Append each benchmark's results to FILE (- for stdout) as JSON lines as soon as they are measured. With -, all other output goes to stderr",
+)
+
+parser.add_argument(
+    "--coordinate",
+    metavar="[HOST:]PORT",
+    help="Serve the selected benchmarks to --worker hosts over TCP and report the merged results per host group. A bare PORT listens on all interfaces",
+)
+
+parser.add_argument(
+    "--worker",
+    metavar="[HOST:]PORT",
+    help="Run benchmarks handed out by the coordinator at this address (default host: localhost)",
+)
+
+parser.add_argument(
+    "--min-workers",
+    type=positive_int,
+    default=1,
+    help="Workers the coordinator waits for before it can finish (default: 1)",
+)
+
+parser.add_argument(
+    "--time-budget",
+    type=float,
+    metavar="SECONDS",
+    help="Predict the Wasm Execution Score from the subset of WasmScore benchmarks and sample counts that best predicts it within SECONDS, chosen from this host's history",
+)
+
+parser.add_argument(
+    "--timeout",
+    type=float,
+    default=3600,
+    metavar="SECONDS",
+    help="Wall-clock limit for each sightglass-cli run of a benchmark, 0 for none (default: 3600)",
+)
+
+parser.add_argument(
+    "--retries",
+    type=int,
+    default=1,
+    help="Times a failed or timed out benchmark run is retried before the benchmark is excluded (default: 1)",
+)
+
+parser.add_argument(
+    "-j",
+    "--jobs",
+    type=positive_int,
+    default=1,
+    help="Number of benchmarks to run concurrently, each pinned to its own set of cores. Default=1",
+)
+
+
+class ResultBuffer:
+    """Append-only columnar store of result rows. Rows are appended to per-column
+    lists as they are produced, and a DataFrame is built only when the results
+    are read, instead of copying everything on every append"""
+
+    def __init__(self):
+        self.columns = {}
+        self.rows = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, results_df):
+        """Appends the rows of a DataFrame, adding columns it introduces"""
+        with self.lock:
+            for column in results_df.columns:
+                values = self.columns.setdefault(str(column), [None] * self.rows)
+                values.extend(results_df[column].tolist())
+            for column, values in self.columns.items():
+                if len(values) < self.rows + len(results_df):
+                    values.extend([None] * len(results_df))
+            self.rows += len(results_df)
+
+    def to_frame(self):
+        """The results as a DataFrame"""
+
+        import pandas as pd
+
+        with self.lock:
+            return pd.DataFrame(self.columns)
+
+
+class BenchmarkFailure(Exception):
+    """A benchmark that failed or timed out on every attempt"""
+
+
 # Global Variables
 args = parser.parse_args()
 ARGS_DICT = vars(args)
 DATE_TIME = datetime.now().strftime("%Y-%m-%d")
+RUN_TIMESTAMP = datetime.now().isoformat(timespec="seconds")
+# Unique even for runs started in the same second, on this host or another
+RUN_ID = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
 logging.basicConfig(
     format="%(asctime)s %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s",
     datefmt="%Y-%m-%d:%H:%M:%S",
     level=args.loglevel.upper(),
 )
 DEFAULT_BENCH_PROCESS_NUM = 3
+# Process counts chosen per benchmark, overriding DEFAULT_BENCH_PROCESS_NUM
+BENCH_PROCESS_NUMS = {}
 SG_BENCHMARKS_BASE = "/sightglass/benchmarks/"
-BENCHMARK_DF = None
-SUITE_DF = None
+BENCHMARK_DF = ResultBuffer()
+SUITE_DF = ResultBuffer()
+THROUGHPUT_DF = ResultBuffer()
+SCALING_DF = ResultBuffer()
+COLDSTART_DF = ResultBuffer()
+STREAM_LOCK = threading.Lock()
+# Copy of stdout the JSON lines of --stream - are written to
+STREAM_STDOUT = None
+# Journal of the benchmarks finished by this run, and of a resumed run's results
+JOURNAL_DIR = "/sightglass/results/journal"
+JOURNAL_LOCK = threading.Lock()
+JOURNAL = {"header": None, "checked": False, "results": {}}
+# Benchmarks excluded from this run's results, benchmark -> reason
+FAILED_BENCHMARKS = {}
 WASMSCORE_CONSTANT = 10000000000
+RESULTS_LOCK = threading.Lock()
+OUTPUT_LOCK = threading.Lock()
+NATIVE_BUILD_LOCKS = {}
+RESULT_CACHE_DIR = "/sightglass/result-cache"
+# Results paths last filled from the result cache rather than a fresh run
+RESULT_CACHE_HITS = set()
+# Per-benchmark directories native benchmarks are run from
+NATIVE_RUN_DIR = "/sightglass/results/native"
+HASH_CACHE_PATH = "/sightglass/hash-cache.json"
+HASH_CACHE = None
+HASH_CACHE_DIRTY = False
+HASH_CACHE_LOCK = threading.Lock()
+BUILD_SHA_FILES = [
+    "add_time_metric.diff",
+    "build.sh",
+    "requirements.txt",
+    "Dockerfile",
+    "wasmscore.py",
+]
+NATIVE_ENGINE_PATH = "/sightglass/engines/native/libengine.so"
+# Registry of the Wasm engines to benchmark, label -> engine settings. Replaced
+# by the engines given with --engines or --engines-config
+WASM_ENGINES = {"Wasmtime": {"path": "/sightglass/engines/wasmtime/libengine.so"}}
+# Settings a coordinator passes on to its workers so every host measures alike
+WORKER_SETTINGS = [
+    "force",
+    "adaptive",
+    "ci_width",
+    "adaptive_budget",
+    "metric",
+    "statistic",
+    "cv_threshold",
+    "memory",
+    "perf_counters",
+    "timeout",
+    "retries",
+]
+# perf_event counters sightglass may report under the perf-counters measure,
+# by the column they are summarized under, and the derived counters reported
+PERF_COUNTER_EVENTS = {
+    "cpu-cycles": "cpu_cycles",
+    "cycles": "cpu_cycles",
+    "instructions": "instructions",
+    "instructions-retired": "instructions",
+    "cache-accesses": "cache_accesses",
+    "cache-references": "cache_accesses",
+    "cache-misses": "cache_misses",
+    "branch-misses": "branch_misses",
+    "L1-dcache-load-misses": "l1d_misses",
+    "LLC-load-misses": "llc_misses",
+    "dTLB-load-misses": "dtlb_misses",
+}
+PERF_COUNTER_DERIVED = {
+    "ipc": "IPC",
+    "cache_mpki": "cache MPKI",
+    "branch_mpki": "branch MPKI",
+    "l1d_mpki": "L1D MPKI",
+    "llc_mpki": "LLC MPKI",
+    "dtlb_mpki": "dTLB MPKI",
+}
+# ColdStart test modules (tiny, so a start is dominated by startup rather than
+# execution), percentiles reported, and the engine flags loading precompiled
+# modules from Wasmtime's compilation cache
+COLDSTART_BENCHMARKS = ["noop", "ackermann"]
+COLDSTART_PERCENTILES = [50, 90, 99, 99.9]
+COLDSTART_ITERATIONS_PER_PROCESS = 100
+COLDSTART_PRECOMPILED_FLAGS = "-C cache=y"
+# Engine flags enabling Wasmtime's JIT profiling agents, and perf's sampling rate
+PROFILE_ENGINE_FLAGS = {"perfmap": "--profile=perfmap", "jitdump": "--profile=jitdump"}
+PROFILE_FREQUENCY = 999
+# Seconds between /proc samples of the virtual memory of a measured run
+MEMORY_SAMPLE_INTERVAL = 0.1
+METRIC_UNITS = {"nanoseconds": "time(ns)", "cycles": "cycles"}
+SUMMARY_GROUP_COLUMNS = ["arch", "engine", "wasm", "phase", "event"]
+SUMMARY_COLUMNS = SUMMARY_GROUP_COLUMNS + [
+    "min",
+    "max",
+    "median",
+    "mean",
+    "mean_deviation",
+    "stddev",
+    "p5",
+    "p95",
+    "cv",
+    "samples",
+]
+RESULT_COLUMNS = [
+    "wasm",
+    "arch",
+    "engine",
+    "phase",
+    "mean",
+    "median",
+    "p5",
+    "p95",
+    "stddev",
+    "cv",
+    "samples",
+]
+# Phases for which a Wasm vs native efficiency is meaningful. A native benchmark
+# has no compilation step to speak of, its Compilation phase is just a dlopen
+EFFICIENCY_PHASES = ["Execution", "Instantiation"]
+ADAPTIVE_ITERATIONS_PER_PROCESS = 10
+# --time-budget: runs of a benchmark the history needs before it can be
+# predicted, most processes given to one benchmark, sightglass-cli's default
+# iterations per process, and the cost of starting a process, in seconds
+TIME_BUDGET_MIN_RUNS = 3
+TIME_BUDGET_MAX_PROCESSES = 10
+TIME_BUDGET_ITERATIONS_PER_PROCESS = 10
+TIME_BUDGET_PROCESS_OVERHEAD = 0.1
+COMPARE_KEY_COLUMNS = ["benchmark", "engine", "phase"]
+COMPARE_BOOTSTRAP_NUM = 1000
+COMPARE_BOOTSTRAP_CHUNK = 4000000
+COMPARE_SIGNIFICANCE = 0.05
+T_CRITICAL_95 = [
+    12.706,
+    4.303,
+    3.182,
+    2.776,
+    2.571,
+    2.447,
+    2.365,
+    2.306,
+    2.262,
+    2.228,
+    2.201,
+    2.179,
+    2.160,
+    2.145,
+    2.131,
+    2.120,
+    2.110,
+    2.101,
+    2.093,
+    2.086,
+    2.080,
+    2.074,
+    2.069,
+    2.064,
+    2.060,
+    2.056,
+    2.052,
+    2.048,
+    2.045,
+    2.042,
+]
+NATIVE_BUILDS_DONE = set()
+NATIVE_SOURCE_DIGESTS = {}
+NATIVE_SOURCE_SUFFIXES = (
+    ".c",
+    ".cc",
+    ".cpp",
+    ".h",
+    ".hpp",
+    ".rs",
+    ".toml",
+    ".patch",
+    ".sh",
+)
+NATIVE_TOOLCHAIN_CMDS = [
+    "cc --version",
+    "clang++ --version",
+    "rustc --version",
+    "cargo --version",
+]
 
 # Dictionaries
 sg_benchmarks_wasm = {
     "blake3-scalar": "blake3-scalar/benchmark.wasm",
+    "blake3-c-scalar": "blake3-simd/benchmark-scalar.wasm",
     "blake3-simd": "blake3-simd/benchmark.wasm",
     "blind-sig": "blind-sig/benchmark.wasm",
     "bzip2": "bz2/benchmark.wasm",
@@ -200,6 +720,7 @@ sg_benchmarks_wasm = {
     "libsodium-verify1": "libsodium/libsodium-verify1.wasm",
     "libsodium-xchacha20": "libsodium/libsodium-xchacha20.wasm",
     "meshoptimizer": "meshoptimizer/benchmark.wasm",
+    "noop": "noop/benchmark.wasm",
     "pulldown-cmark": "pulldown-cmark/benchmark.wasm",
     "ackermann": "shootout/shootout-ackermann.wasm",
     "base64": "shootout/shootout-base64.wasm",
@@ -224,6 +745,9 @@ sg_benchmarks_wasm = {
 }
 
 sg_benchmarks_native = {
+    "blake3-c-scalar": "blake3-simd/blake3-scalar.so",
+    "blake3-simd": "blake3-simd/blake3-simd.so",
+    "bzip2": "bz2/benchmark.so",
     "meshoptimizer": "meshoptimizer/codecbench-simd.so",
     "tract_mobilenet_v2_onnx": "inference_tract/mobile_net_v2_onnx_benchmark.so",
     "tract_mobilenet_v2_tensorflow": "inference_tract/mobile_net_v2_tensorflow_benchmark.so",
@@ -252,6 +776,9 @@ sg_benchmarks_native_build = {
     "tract_mobilenet_v2_onnx": "./build_mobile_net_v2_onnx_native.sh",
     "tract_mobilenet_v2_tensorflow": "./build_mobile_net_v2_tensorflow_native.sh",
     "meshoptimizer": "./build-native.sh",
+    "blake3-c-scalar": "./build-native.sh",
+    "blake3-simd": "./build-native.sh",
+    "bzip2": "./build-native.sh",
     "ackermann": "./build-native.sh",
     "base64": "./build-native.sh",
     "ctype": "./build-native.sh",
@@ -274,6 +801,25 @@ sg_benchmarks_native_build = {
 }
 
 
+# Benchmarks that read an input file, and the file they read, for --scaling
+SCALING_INPUTS = {
+    "blake3-scalar": "default.input",
+    "bzip2": "default.input",
+    "hex-simd": "default.input",
+    "pulldown-cmark": "default.input.md",
+}
+# Benchmarks whose native build reads the same input, giving --scaling a
+# Wasm/native ratio
+SCALING_NATIVE_BENCHMARKS = ["bzip2"]
+
+# SimdScore pairs of scalar and SIMD variants of the same workload, built from
+# the same sources and run on the same input
+SIMD_PAIRS = {
+    "blake3": ("blake3-c-scalar", "blake3-simd"),
+}
+# Hosts the native SIMD builds of the pairs target (SSE2)
+SIMD_NATIVE_MACHINES = ["x86_64", "amd64", "i386", "i686"]
+
 perf_suites = {
     "app-wasmscore": ["meshoptimizer"],
     "core-wasmscore": ["ackermann", "ctype", "fibonacci"],
@@ -378,511 +924,3577 @@ perf_suites = {
         "libsodium-verify1",
         "libsodium-xchacha20",
     ],
-    "scalar-simdscore": ["blake3-scalar"],
-    "simd-simdscore": ["blake3-simd"],
+    "scalar-simdscore": [scalar for scalar, _ in SIMD_PAIRS.values()],
+    "simd-simdscore": [simd for _, simd in SIMD_PAIRS.values()],
 }
 
+SIMDSCORE_SUITES = ["scalar-simdscore", "simd-simdscore"]
+
+WASMSCORE_SUITES = [
+    "ai-wasmscore",
+    "app-wasmscore",
+    "core-wasmscore",
+    "crypto-wasmscore",
+    "regex-wasmscore",
+]
+
 perf_tests = [
     "WasmScore",
     "SimdScore",
     "Quickrun-WasmScore",
     "Quickrun-SimdScore",
     "Quickrun-All",
+    "ColdStart",
 ]
 
 
 # Build dictionaries based on cmd flags and directory file structure
-def run_benchmarks(benchmark, run_native=False):
-    """Runs the benchmark"""
+def build_native_benchmark(benchmark):
+    """Builds the native benchmark. Benchmarks sharing a build directory and
+    script are built once per run, and never concurrently"""
 
-    logging.info("Running benchmark ...")
-    logging.info("Run native ... %s", run_native)
+    native_benchmark_dir = os.path.dirname(
+        f"{SG_BENCHMARKS_BASE}" + sg_benchmarks_native[benchmark]
+    )
+    native_benchmark_path = f"{SG_BENCHMARKS_BASE}" + sg_benchmarks_native[benchmark]
+    native_build_cmd_string = sg_benchmarks_native_build[benchmark]
+    logging.debug("native_benchmark_build_path ... %s", native_build_cmd_string)
 
-    results_dir = f"{SG_BENCHMARKS_BASE}/results/"
+    build_key = (native_benchmark_dir, native_build_cmd_string)
+    with RESULTS_LOCK:
+        build_lock = NATIVE_BUILD_LOCKS.setdefault(build_key, threading.Lock())
 
-    create_results_path_cmd_string = f"mkdir -p {results_dir}"
-    try:
-        logging.info(
-            "Trying mkdir for results_path ... %s", create_results_path_cmd_string
-        )
-        output = subprocess.check_output(
-            create_results_path_cmd_string,
-            shell=True,
-            text=True,
-            stderr=subprocess.STDOUT,
-        )
-        logging.debug("%s", output)
-    except subprocess.CalledProcessError as error:
-        print(f"mkdir for build folder failed with error code {error.returncode}")
-        sys.exit(error.returncode)
+    with build_lock:
+        cache_path = None
+        if not ARGS_DICT["no_build_cache"]:
+            cache_key = native_build_cache_key(benchmark, build_key)
+            cache_path = os.path.join(
+                ARGS_DICT["build_cache_dir"],
+                f"{cache_key}-{os.path.basename(native_benchmark_path)}",
+            )
+            logging.debug("native build cache path ... %s", cache_path)
 
-    native_df = None
-    if run_native and sg_benchmarks_native[benchmark]:
-        print_verbose(f"Collecting Native ({benchmark}).")
+        if cache_path and os.path.isfile(cache_path):
+            logging.info("Native build cache hit for %s ... ", benchmark)
+            os.makedirs(os.path.dirname(native_benchmark_path), exist_ok=True)
+            shutil.copy2(cache_path, native_benchmark_path)
+            os.utime(cache_path)
+        else:
+            if build_key not in NATIVE_BUILDS_DONE:
+                run_or_fail(
+                    "native build", native_build_cmd_string, native_benchmark_dir
+                )
+                NATIVE_BUILDS_DONE.add(build_key)
+            if not os.path.isfile(native_benchmark_path):
+                raise BenchmarkFailure(
+                    f"native build produced no {sg_benchmarks_native[benchmark]}"
+                )
 
-        native_benchmark_dir = os.path.dirname(
-            f"{SG_BENCHMARKS_BASE}" + sg_benchmarks_native[benchmark]
-        )
-        logging.debug("native_benchmark_dir ... %s", native_benchmark_dir)
+            if cache_path and os.path.isfile(native_benchmark_path):
+                store_native_build(native_benchmark_path, cache_path)
 
-        native_benchmark_path = (
-            f"{SG_BENCHMARKS_BASE}" + sg_benchmarks_native[benchmark]
-        )
-        logging.debug("native_benchmark_path ... %s", native_benchmark_path)
+        prepare_native_run_dir(benchmark)
 
-        results_path = f"{results_dir}/{benchmark}" + "_native_results.csv"
-        logging.debug("results_path ... %s", results_path)
 
-        results_summarized_path = (
-            f"{SG_BENCHMARKS_BASE}/results/{benchmark}"
-            + "_results_native_summarized.csv"
-        )
-        logging.debug("results_summarized_path ... %s", results_summarized_path)
+def is_wasm_built(benchmark):
+    """Whether a benchmark's Wasm module is present in the benchmarks tree"""
+    return os.path.isfile(f"{SG_BENCHMARKS_BASE}" + sg_benchmarks_wasm[benchmark])
+
+
+def get_native_run_path(benchmark):
+    """Path a native benchmark is run from: its own copy in a directory of its
+    own, so benchmarks sharing a build directory never share a benchmark.so"""
+    return os.path.join(
+        NATIVE_RUN_DIR, benchmark, os.path.basename(sg_benchmarks_native[benchmark])
+    )
+
+
+def prepare_native_run_dir(benchmark):
+    """Fills a native benchmark's run directory: links to the files of its build
+    directory (inputs, expected outputs) and copies of the built library, both
+    under its own name and as the ./benchmark.so the native engine loads"""
+    native_benchmark_path = f"{SG_BENCHMARKS_BASE}" + sg_benchmarks_native[benchmark]
+    native_benchmark_dir = os.path.dirname(native_benchmark_path)
+    native_run_path = get_native_run_path(benchmark)
+    native_run_dir = os.path.dirname(native_run_path)
+    os.makedirs(native_run_dir, exist_ok=True)
+    for entry in os.listdir(native_benchmark_dir):
+        link_path = os.path.join(native_run_dir, entry)
+        if entry.endswith(".so") or os.path.lexists(link_path):
+            continue
+        os.symlink(os.path.join(native_benchmark_dir, entry), link_path)
+    for run_path in [native_run_path, os.path.join(native_run_dir, "benchmark.so")]:
+        tmp_path = f"{run_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copy2(native_benchmark_path, tmp_path)
+        os.replace(tmp_path, run_path)
 
-        results_summarized_transposed_path = (
-            f"{SG_BENCHMARKS_BASE}/results/{benchmark}"
-            + "_results_native_summarized_transposed.csv"
-        )
-        logging.debug(
-            "results_summarized_transposed_path ... %s",
-            results_summarized_transposed_path,
-        )
 
-        native_build_cmd_string = sg_benchmarks_native_build[benchmark];
-        logging.debug("native_benchmark_build_path ... %s", native_build_cmd_string);
+@functools.lru_cache(maxsize=None)
+def get_toolchain_version():
+    """Version strings of the native toolchains, part of every build cache key"""
+    versions = []
+    for cmd_string in NATIVE_TOOLCHAIN_CMDS:
         try:
-            logging.info("Trying native build ... ")
-            output = subprocess.check_output(
-                native_build_cmd_string.split(),
-                shell=True,
-                text=True,
-                cwd=f"{native_benchmark_dir}",
-                stderr=subprocess.STDOUT,
-            )
-            logging.debug("%s", output)
-        except subprocess.CalledProcessError as error:
-            print(
-                f"Building native benchmark ({benchmark}) failed with error code {error.returncode}"
+            versions.append(
+                subprocess.check_output(
+                    cmd_string.split(), text=True, stderr=subprocess.STDOUT
+                )
             )
-            sys.exit(error.returncode)
+        except (OSError, subprocess.CalledProcessError):
+            versions.append(f"{cmd_string}: not available")
+    return "\n".join(versions)
 
-        if not os.path.basename(f"{native_benchmark_path}") == "benchmark.so":
-            native_build_cp_string = f"cp {native_benchmark_path} ./benchmark.so"
-            try:
-                logging.info("Trying native cp ... ")
-                output = subprocess.check_output(
-                    native_build_cp_string.split(),
-                    shell=False,
-                    text=True,
-                    cwd=f"{native_benchmark_dir}",
-                    stderr=subprocess.STDOUT,
-                )
-                logging.debug("%s", output)
-            except subprocess.CalledProcessError as error:
-                print(f"Building native failed with error code {error.returncode}")
-                sys.exit(error.returncode)
 
-        cli_cmd_string = (
-            "LD_LIBRARY_PATH=/sightglass/engines/native/ "
-            "/sightglass/target/release/sightglass-cli benchmark "
-            f"{native_benchmark_path} --engine "
-            f"/sightglass/engines/native/libengine.so --processes={DEFAULT_BENCH_PROCESS_NUM} --raw "
-            f"--output-format csv --output-file {results_path}"
+def hash_file(path, digest):
+    """Feed a file's contents into the given hashlib digest"""
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+
+
+def get_native_source_digest(native_benchmark_dir):
+    """Hash of the native sources, patches and build scripts in a benchmark
+    directory. Build outputs (cargo targets, *_native copies, git checkouts)
+    are skipped"""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(native_benchmark_dir):
+        dirs[:] = sorted(
+            name
+            for name in dirs
+            if name != "target"
+            and not name.endswith("_native")
+            and not os.path.exists(os.path.join(root, name, ".git"))
         )
+        for name in sorted(files):
+            if name.endswith(NATIVE_SOURCE_SUFFIXES) or name.startswith("Dockerfile"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, native_benchmark_dir).encode())
+                hash_file(path, digest)
+    return digest.hexdigest()
 
-        try:
-            logging.info(
-                "Trying sightglass-cli benchmark command for native ... %s",
-                cli_cmd_string,
-            )
-            output = subprocess.check_output(
-                cli_cmd_string,
-                shell=True,
-                text=True,
-                cwd=f"{native_benchmark_dir}",
-                stderr=subprocess.STDOUT,
-                executable="/bin/bash",
-            )
-            logging.debug("%s", output)
-        except subprocess.CalledProcessError as error:
-            print(
-                f"Running sightglass-cli benchmark ({benchmark}) failed with error code {error.returncode}"
-            )
-            sys.exit(error.returncode)
 
-        cli_summarize_string = (
-            f"/sightglass/target/release/sightglass-cli summarize --input-format csv "
-            f"--output-format csv -f {results_path} > {results_summarized_path}"
+def native_build_cache_key(benchmark, build_key):
+    """Content address of a native build: sources, build script, toolchain
+    versions and the native engine the benchmark links against"""
+    native_benchmark_dir, native_build_cmd_string = build_key
+    if build_key not in NATIVE_SOURCE_DIGESTS:
+        NATIVE_SOURCE_DIGESTS[build_key] = get_native_source_digest(
+            native_benchmark_dir
         )
 
+    digest = hashlib.sha256()
+    digest.update(sg_benchmarks_native[benchmark].encode())
+    digest.update(native_build_cmd_string.encode())
+    digest.update(NATIVE_SOURCE_DIGESTS[build_key].encode())
+    digest.update(get_toolchain_version().encode())
+    digest.update(hash_artifact(NATIVE_ENGINE_PATH).encode())
+    return digest.hexdigest()
+
+
+def store_native_build(native_benchmark_path, cache_path):
+    """Store a freshly built native benchmark in the build cache, then evict the
+    least recently used entries until the cache fits its size limit"""
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copy2(native_benchmark_path, tmp_path)
+    os.replace(tmp_path, cache_path)
+    os.utime(cache_path)
+    logging.info("Stored native build in cache ... %s", cache_path)
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isfile(path) and not name.endswith(".tmp"):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    cache_size = sum(size for _, size, _ in entries)
+    size_limit = ARGS_DICT["build_cache_size"] * 1024 * 1024
+    for _, size, path in sorted(entries):
+        if cache_size <= size_limit:
+            break
+        if path == cache_path:
+            continue
+        logging.info("Evicting native build from cache ... %s", path)
+        os.remove(path)
+        cache_size -= size
+
+
+def load_hash_cache():
+    """Digests persisted by earlier runs, keyed on algorithm and path. Call with
+    HASH_CACHE_LOCK held"""
+    global HASH_CACHE
+    if HASH_CACHE is None:
         try:
-            logging.info(
-                "Trying sightglass-cli summarize command for native ... %s",
-                cli_summarize_string,
-            )
-            output = subprocess.check_output(
-                cli_summarize_string,
-                shell=True,
-                text=True,
-                cwd=f"{native_benchmark_dir}",
-                stderr=subprocess.STDOUT,
-                executable="/bin/bash",
-            )
-            logging.debug("%s", output)
-        except subprocess.CalledProcessError as error:
-            print(
-                f"Running sightglass-cli summarize failed with error code {error.returncode}"
-            )
-            sys.exit(error.returncode)
+            with open(HASH_CACHE_PATH, encoding="utf-8") as cache_file:
+                HASH_CACHE = json.load(cache_file)
+        except (OSError, ValueError):
+            HASH_CACHE = {}
+    return HASH_CACHE
 
-        if os.stat(results_summarized_path).st_size == 0:
-            print("Native execution did not run properly ... exiting")
-            sys.exit(1)
-        else:
-            logging.info("Trying printing native benchmark results ...")
-            os.system(
-                f'grep -v "cycles"  {results_summarized_path} > results/tmpfile '
-                f"&& mv results/tmpfile {results_summarized_path}"
-            )
-            pd.read_csv(
-                results_summarized_path, usecols=["phase", "mean"], header=0
-            ).to_csv(results_summarized_transposed_path, header=True, index=False)
-
-            native_df = pd.read_csv(
-                results_summarized_path,
-                usecols=["wasm", "arch", "engine", "phase", "mean"],
-            )[["wasm", "arch", "engine", "phase", "mean"]]
-            native_df = native_df.rename(columns={"wasm": "benchmark"})
-            native_df.loc[:, ["engine"]] = "Native"
-            native_df.loc[:, ["benchmark"]] = f"{benchmark}"
-
-            os.system(f"sed -i 1d {results_summarized_transposed_path}")
-            if not ARGS_DICT["quiet"]:
-                termgraph_title = f"{benchmark} native time(ns)"
-                os.system(
-                    f"termgraph {results_summarized_transposed_path} "
-                    f'--title "{termgraph_title}" --color blue'
-                )
-            else:
-                if isinstance(native_df, pd.DataFrame):
-                    print(native_df.to_csv(index=False, header=None, sep=","))
 
-            os.system("cd /sightglass".format(native_benchmark_dir))
-    elif run_native:
-        print_verbose(f"Native {benchmark} is not supported")
+def save_hash_cache():
+    """Persists the digest cache if any digest was computed by this run"""
+    global HASH_CACHE_DIRTY
+    with HASH_CACHE_LOCK:
+        if not HASH_CACHE_DIRTY:
+            return
+        tmp_path = f"{HASH_CACHE_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(HASH_CACHE, cache_file)
+            os.replace(tmp_path, HASH_CACHE_PATH)
+            HASH_CACHE_DIRTY = False
+        except OSError as error:
+            logging.info("Could not save hash cache ... %s", error)
 
-    print_verbose(f"Collecting Wasm ({benchmark}).")
 
-    wasm_benchmark_dir = os.path.dirname(
-        f"{SG_BENCHMARKS_BASE}" + sg_benchmarks_wasm[benchmark]
-    )
-    logging.debug("wasm_benchmark_dir ... %s", wasm_benchmark_dir)
+def hash_artifact(path, algorithm="sha256"):
+    """Digest of a benchmark, engine or build artifact, empty if it does not
+    exist. Digests are cached by (path, size, mtime) across runs"""
+    global HASH_CACHE_DIRTY
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ""
+    key = f"{algorithm}:{os.path.abspath(path)}"
+    with HASH_CACHE_LOCK:
+        entry = load_hash_cache().get(key)
+    if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return entry[2]
 
-    wasm_benchmark_path = f"{SG_BENCHMARKS_BASE}" + sg_benchmarks_wasm[benchmark]
-    logging.debug("wasm_benchmark_path ... %s", wasm_benchmark_path)
+    digest = hashlib.new(algorithm)
+    hash_file(path, digest)
+    with HASH_CACHE_LOCK:
+        HASH_CACHE[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        HASH_CACHE_DIRTY = True
+    return digest.hexdigest()
 
-    results_path = f"{results_dir}/{benchmark}" + "_wasm_results.csv"
-    logging.debug("results_path ... %s", results_path)
 
-    results_summarized_path = (
-        f"{SG_BENCHMARKS_BASE}/results/{benchmark}" + "_results_wasm_summarized.csv"
+@functools.lru_cache(maxsize=None)
+def get_host_fingerprint():
+    """Short hash identifying the host hardware and kernel results are measured on"""
+    cpu_model = []
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as cpuinfo:
+            for line in cpuinfo:
+                key = line.split(":", 1)[0].strip().lower()
+                if key in ("model name", "cpu implementer", "cpu part"):
+                    cpu_model.append(line.split(":", 1)[1].strip())
+                elif not line.strip() and cpu_model:
+                    break
+    except OSError:
+        pass
+    host_string = "|".join(
+        [
+            platform.machine(),
+            platform.system(),
+            platform.release(),
+            " ".join(cpu_model),
+            str(os.cpu_count()),
+        ]
     )
-    logging.debug("results_summarized_path ... %s", results_summarized_path)
+    logging.debug("host fingerprint string ... %s", host_string)
+    return hashlib.sha1(host_string.encode()).hexdigest()[:12]
 
-    results_summarized_transposed_path = (
-        f"{SG_BENCHMARKS_BASE}/results/{benchmark}"
-        + "_results_wasm_summarized_transposed.csv"
-    )
-    logging.debug(
-        "results_summarized_transposed_path ... %s",
-        results_summarized_transposed_path,
-    )
 
-    termgraph_title = f"{benchmark} wasm time(ns)"
+def get_result_cache_key(benchmark_path, engine_path, settings):
+    """Key of a raw result: benchmark artifact and its inputs, engine, run
+    settings and host"""
+    digest = hashlib.sha256()
+    digest.update(hash_artifact(benchmark_path).encode())
+    benchmark_dir = os.path.dirname(benchmark_path)
+    for input_path in sorted(glob.glob(os.path.join(benchmark_dir, "*.input*"))):
+        digest.update(hash_artifact(input_path).encode())
+    digest.update(hash_artifact(engine_path).encode())
+    digest.update(settings.encode())
+    digest.update(get_host_fingerprint().encode())
+    return digest.hexdigest()
 
-    cli_cmd_string = (
-        f"/sightglass/target/release/sightglass-cli benchmark "
-        f"--processes={DEFAULT_BENCH_PROCESS_NUM} --engine "
-        f"/sightglass/engines/wasmtime/libengine.so --raw --output-format csv --output-file "
-        f"{results_path} -- {wasm_benchmark_path}"
-    )
 
-    try:
-        logging.info(
-            "Trying sightglass-cli benchmark command for wasm ... %s", cli_cmd_string
-        )
-        output = subprocess.check_output(
-            cli_cmd_string,
-            shell=True,
-            text=True,
-            cwd=f"{wasm_benchmark_dir}",
-            stderr=subprocess.STDOUT,
+def get_relative_ci_width(samples):
+    """Width of the 95% confidence interval of the samples' mean, relative to
+    the mean. Uses Student's t, approximated for more than 30 degrees of freedom"""
+
+    import numpy as np
+
+    if len(samples) < 2:
+        return float("inf")
+    dof = len(samples) - 1
+    if dof <= len(T_CRITICAL_95):
+        t_critical = T_CRITICAL_95[dof - 1]
+    else:
+        t_critical = 1.96 + 2.37 / dof
+    half_width = t_critical * np.std(samples, ddof=1) / np.sqrt(len(samples))
+    return 2 * half_width / np.mean(samples)
+
+
+def run_adaptive_sampling(benchmark, run_cli, results_path):
+    """Adds one process at a time until the confidence interval of the Execution
+    mean is narrower than --ci-width, or --adaptive-budget seconds are spent"""
+
+    import pandas as pd
+
+    start_time = time.monotonic()
+    batch_path = f"{results_path}.batch"
+    raw_dfs = []
+    while True:
+        run_cli(
+            f"--processes=1 --iterations-per-process={ADAPTIVE_ITERATIONS_PER_PROCESS}",
+            batch_path,
         )
-        logging.debug("%s", output)
+        raw_dfs.append(pd.read_csv(batch_path))
+        raw_df = pd.concat(raw_dfs)
+        execution_samples = raw_df.loc[
+            (raw_df["phase"] == "Execution") & (raw_df["event"] == ARGS_DICT["metric"]),
+            "count",
+        ].to_numpy(dtype="float64")
+
+        ci_width = get_relative_ci_width(execution_samples)
+        elapsed = time.monotonic() - start_time
+        logging.info(
+            "Adaptive sampling %s ... %d samples, ci width %.4f, %.1fs elapsed",
+            benchmark,
+            len(execution_samples),
+            ci_width,
+            elapsed,
+        )
+        if ci_width <= ARGS_DICT["ci_width"] or elapsed >= ARGS_DICT["adaptive_budget"]:
+            break
+
+    print_verbose(
+        f"Sampled {benchmark} {len(execution_samples)} times "
+        f"(confidence interval width {ci_width:.2%}, {elapsed:.1f}s)."
+    )
+    raw_df.to_csv(results_path, index=False)
+    os.remove(batch_path)
+
+
+def get_sightglass_command(
+    engine_path,
+    benchmark_path,
+    sampling_args,
+    output_path,
+    cores=None,
+    engine_flags=None,
+    measure=None,
+):
+    """sightglass-cli benchmark command line writing raw CSV results"""
+    taskset_prefix = f"taskset -c {format_cores(cores)} " if cores else ""
+    engine_flags_arg = (
+        f"--engine-flags={shlex.quote(engine_flags)} " if engine_flags else ""
+    )
+    if measure:
+        engine_flags_arg += f"--measure {measure} "
+    return (
+        f"LD_LIBRARY_PATH={os.path.dirname(engine_path)}/ "
+        f"{taskset_prefix}/sightglass/target/release/sightglass-cli benchmark "
+        f"--engine {engine_path} {engine_flags_arg}{sampling_args} --raw --output-format csv "
+        f"--output-file {output_path} -- {benchmark_path}"
+    )
+
+
+def get_process_num(benchmark):
+    """Number of sightglass-cli processes a benchmark is sampled with"""
+    return BENCH_PROCESS_NUMS.get(benchmark, DEFAULT_BENCH_PROCESS_NUM)
+
+
+def run_sightglass_benchmark(
+    benchmark,
+    engine_path,
+    benchmark_path,
+    results_path,
+    cores=None,
+    engine_flags=None,
+    measure=None,
+):
+    """Runs sightglass-cli benchmark for one engine, writing raw results to
+    results_path. Engine flags, if any, are passed to the bench-api engine, and
+    measure selects a sightglass measure other than the default. Raw results
+    cached for the same benchmark, engine, settings and host are reused instead,
+    unless --force is given"""
+
+    adaptive = ARGS_DICT["adaptive"] and not measure
+    if adaptive:
+        settings = f"adaptive={ARGS_DICT['ci_width']},{ARGS_DICT['adaptive_budget']}"
+    else:
+        settings = f"processes={get_process_num(benchmark)}"
+    if engine_flags:
+        settings += f",engine-flags={engine_flags}"
+    if measure:
+        settings += f",measure={measure}"
+    cache_key = get_result_cache_key(benchmark_path, engine_path, settings)
+    cache_path = os.path.join(RESULT_CACHE_DIR, f"{cache_key}.csv")
+    memory_cache_path = os.path.join(RESULT_CACHE_DIR, f"{cache_key}.memory.json")
+    measure_memory = ARGS_DICT["memory"] and not measure
+    if (
+        not ARGS_DICT["force"]
+        and os.path.isfile(cache_path)
+        and (not measure_memory or os.path.isfile(memory_cache_path))
+    ):
+        logging.info("Result cache hit ... %s", cache_path)
+        print_verbose(f"Reusing cached results ({benchmark}).")
+        shutil.copyfile(cache_path, results_path)
+        os.utime(cache_path)
+        RESULT_CACHE_HITS.add(results_path)
+        if measure_memory:
+            with open(memory_cache_path, encoding="utf-8") as memory_file:
+                return json.load(memory_file)
+        return None
+    RESULT_CACHE_HITS.discard(results_path)
+
+    memory_usage = {"processes": 0}
+
+    def run_cli(sampling_args, output_path, processes=1):
+        cli_cmd_string = get_sightglass_command(
+            engine_path,
+            benchmark_path,
+            sampling_args,
+            output_path,
+            cores,
+            engine_flags,
+            measure,
+        )
+        for attempt in range(ARGS_DICT["retries"] + 1):
+            try:
+                logging.info("Trying sightglass-cli benchmark ... %s", cli_cmd_string)
+                if measure_memory:
+                    output, run_memory_usage = run_memory_measured(
+                        cli_cmd_string, os.path.dirname(benchmark_path), get_timeout()
+                    )
+                    add_memory_usage(memory_usage, run_memory_usage, processes)
+                else:
+                    output = run_with_timeout(
+                        cli_cmd_string, os.path.dirname(benchmark_path), get_timeout()
+                    )
+                logging.debug("%s", output)
+                return
+            except subprocess.CalledProcessError as error:
+                logging.debug("%s", error.output)
+                failure = f"failed with error code {error.returncode}"
+            except subprocess.TimeoutExpired:
+                failure = f"timed out after {get_timeout():g}s"
+            retry_note = " (retrying)" if attempt < ARGS_DICT["retries"] else ""
+            print(
+                f"Running sightglass-cli benchmark ({benchmark}) {failure}{retry_note}"
+            )
+        raise BenchmarkFailure(failure)
+
+    if adaptive:
+        run_adaptive_sampling(benchmark, run_cli, results_path)
+    else:
+        run_cli(
+            f"--processes={get_process_num(benchmark)}",
+            results_path,
+            get_process_num(benchmark),
+        )
+
+    os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copyfile(results_path, tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    if measure_memory:
+        memory_usage = get_memory_columns(memory_usage)
+        with open(tmp_path, "w", encoding="utf-8") as memory_file:
+            json.dump(memory_usage, memory_file)
+        os.replace(tmp_path, memory_cache_path)
+    evict_result_cache(cache_key)
+    return memory_usage if measure_memory else None
+
+
+def evict_result_cache(keep_key):
+    """Evict the least recently used result cache entries, the raw results and
+    memory usage stored under one cache key, until the cache fits its size
+    limit. The entry just stored under keep_key is never evicted"""
+    entries = {}
+    with RESULTS_LOCK:
+        for name in os.listdir(RESULT_CACHE_DIR):
+            path = os.path.join(RESULT_CACHE_DIR, name)
+            if name.endswith(".tmp") or not os.path.isfile(path):
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            key = name.split(".")[0]
+            mtime, size, paths = entries.get(key, (0, 0, []))
+            entries[key] = (
+                max(mtime, stat.st_mtime),
+                size + stat.st_size,
+                paths + [path],
+            )
+
+        cache_size = sum(size for _, size, _ in entries.values())
+        size_limit = ARGS_DICT["result_cache_size"] * 1024 * 1024
+        for key, (_, size, paths) in sorted(entries.items(), key=lambda e: e[1][0]):
+            if cache_size <= size_limit:
+                break
+            if key == keep_key:
+                continue
+            logging.info("Evicting results from cache ... %s", key)
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            cache_size -= size
+
+
+def clear_result_cache():
+    """Remove every cached benchmark result"""
+    if not os.path.isdir(RESULT_CACHE_DIR):
+        print("The result cache is empty")
+        return
+    cache_size = sum(
+        os.path.getsize(os.path.join(RESULT_CACHE_DIR, name))
+        for name in os.listdir(RESULT_CACHE_DIR)
+    )
+    shutil.rmtree(RESULT_CACHE_DIR)
+    print(f"Cleared the result cache ({cache_size / (1024 * 1024):.1f} MB)")
+
+
+def get_process_tree(root_pid):
+    """Pids of a process and all of its descendants, from /proc"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as stat:
+                ppid = int(stat.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree = [root_pid]
+    for pid in tree:
+        tree.extend(children.get(pid, []))
+    return tree
+
+
+def sample_vm_peaks(root_pid, vm_peaks, stop_event):
+    """Records the peak virtual memory size (VmPeak, KiB) of every process in a
+    process tree until stop_event is set. This includes reserved but untouched
+    mappings such as linear memory guard regions"""
+    while True:
+        for pid in get_process_tree(root_pid):
+            try:
+                with open(f"/proc/{pid}/status", encoding="utf-8") as status:
+                    for line in status:
+                        if line.startswith("VmPeak:"):
+                            vm_peaks[pid] = max(
+                                vm_peaks.get(pid, 0), int(line.split()[1])
+                            )
+                            break
+            except (OSError, ValueError):
+                continue
+        if stop_event.wait(MEMORY_SAMPLE_INTERVAL):
+            return
+
+
+def get_timeout():
+    """Wall-clock limit of a sightglass-cli run in seconds, None for no limit"""
+    return ARGS_DICT["timeout"] or None
+
+
+def kill_process_group(pgid):
+    """Kills a process group, if any of it is still running"""
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def run_with_timeout(cmd_string, cwd, timeout=None, stderr=subprocess.STDOUT):
+    """Runs a shell command like subprocess.check_output, in its own process
+    group so a run exceeding timeout seconds is killed along with everything it
+    started"""
+    with subprocess.Popen(
+        cmd_string,
+        shell=True,
+        text=True,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=stderr,
+        executable="/bin/bash",
+        start_new_session=True,
+    ) as process:
+        try:
+            output, error_output = process.communicate(timeout=timeout)
+        except BaseException:
+            kill_process_group(process.pid)
+            process.communicate()
+            raise
+    if process.returncode:
+        raise subprocess.CalledProcessError(
+            process.returncode, cmd_string, output, error_output
+        )
+    return output
+
+
+def run_or_fail(description, cmd_string, cwd, stderr=subprocess.STDOUT):
+    """Runs a shell command with run_with_timeout under the --timeout limit,
+    raising BenchmarkFailure if it fails or times out"""
+    try:
+        logging.info("Trying %s ... %s", description, cmd_string)
+        output = run_with_timeout(cmd_string, cwd, get_timeout(), stderr)
     except subprocess.CalledProcessError as error:
+        logging.debug("%s", error.output)
+        if error.stderr:
+            logging.debug("%s", error.stderr)
+        raise BenchmarkFailure(
+            f"{description} failed with error code {error.returncode}"
+        ) from error
+    except subprocess.TimeoutExpired as error:
+        raise BenchmarkFailure(
+            f"{description} timed out after {get_timeout():g}s"
+        ) from error
+    logging.debug("%s", output)
+    return output
+
+
+def run_memory_measured(cmd_string, cwd, timeout=None):
+    """Runs a shell command like run_with_timeout, also returning the peak RSS
+    and page faults of its process tree from wait4 rusage, and its peak virtual
+    memory sampled from /proc"""
+
+    process = subprocess.Popen(
+        cmd_string,
+        shell=True,
+        text=True,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        executable="/bin/bash",
+        start_new_session=True,
+    )
+    vm_peaks = {}
+    stop_event = threading.Event()
+    sampler = threading.Thread(
+        target=sample_vm_peaks, args=(process.pid, vm_peaks, stop_event), daemon=True
+    )
+    sampler.start()
+    timed_out = threading.Event()
+
+    def kill_on_timeout():
+        timed_out.set()
+        kill_process_group(process.pid)
+
+    killer = threading.Timer(timeout or 0, kill_on_timeout)
+    if timeout:
+        killer.start()
+    try:
+        with process.stdout:
+            output = process.stdout.read()
+        # rusage of the waited child includes its own waited-for descendants
+        _, status, rusage = os.wait4(process.pid, 0)
+    except BaseException:
+        kill_process_group(process.pid)
+        raise
+    finally:
+        killer.cancel()
+        stop_event.set()
+        sampler.join()
+    if os.WIFEXITED(status):
+        process.returncode = os.WEXITSTATUS(status)
+    else:
+        process.returncode = -os.WTERMSIG(status)
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd_string, timeout, output)
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd_string, output)
+
+    return output, {
+        "peak_rss_kb": rusage.ru_maxrss,
+        "minor_faults": rusage.ru_minflt,
+        "major_faults": rusage.ru_majflt,
+        "vm_peak_kb": max(vm_peaks.values(), default=0),
+    }
+
+
+def add_memory_usage(memory_usage, run_memory_usage, processes):
+    """Accumulates the memory usage of one sightglass-cli run: peaks are maxed,
+    page faults summed"""
+    memory_usage["processes"] += processes
+    for column in ["peak_rss_kb", "vm_peak_kb"]:
+        memory_usage[column] = max(
+            memory_usage.get(column, 0), run_memory_usage[column]
+        )
+    for column in ["minor_faults", "major_faults"]:
+        memory_usage[column] = memory_usage.get(column, 0) + run_memory_usage[column]
+
+
+def get_memory_columns(memory_usage):
+    """Memory columns of a benchmark run, with page faults per benchmark process"""
+    processes = max(memory_usage["processes"], 1)
+    return {
+        "peak_rss_kb": memory_usage["peak_rss_kb"],
+        "vm_peak_kb": memory_usage["vm_peak_kb"],
+        "minor_faults": memory_usage["minor_faults"] / processes,
+        "major_faults": memory_usage["major_faults"] / processes,
+    }
+
+
+def summarize_results(results_path, results_summarized_path):
+    """Summarizes raw sightglass results in-process, in the same format as
+    `sightglass-cli summarize` plus stddev, 5th/95th percentile, coefficient of
+    variation and sample count columns. The raw CSV is read once and all
+    statistics are computed with vectorized group-bys"""
+
+    import numpy as np
+    import pandas as pd
+
+    raw_df = pd.read_csv(results_path, usecols=SUMMARY_GROUP_COLUMNS + ["count"])
+    raw_df["count"] = raw_df["count"].astype("float64")
+    raw_df["deviation"] = (
+        raw_df["count"]
+        - raw_df.groupby(SUMMARY_GROUP_COLUMNS, sort=False)["count"].transform("mean")
+    ).abs()
+
+    grouped = raw_df.groupby(SUMMARY_GROUP_COLUMNS, sort=False)
+    summary_df = grouped["count"].agg(["min", "max", "median", "mean", "std", "count"])
+    summary_df["median"] = np.floor(summary_df["median"])
+    summary_df["mean_deviation"] = grouped["deviation"].mean()
+    percentiles_df = grouped["count"].quantile([0.05, 0.95]).unstack()
+    summary_df["p5"] = percentiles_df[0.05]
+    summary_df["p95"] = percentiles_df[0.95]
+    summary_df = summary_df.rename(columns={"std": "stddev", "count": "samples"})
+    summary_df = summary_df.fillna({"stddev": 0.0})
+    summary_df["cv"] = summary_df["stddev"] / summary_df["mean"]
+    summary_df = summary_df.astype({"min": "int64", "max": "int64", "median": "int64"})
+    summary_df = summary_df.reset_index()[SUMMARY_COLUMNS]
+
+    summary_df.to_csv(results_summarized_path, index=False)
+    return summary_df
+
+
+def get_engine_run(benchmark, engine):
+    """Engine path, benchmark path, results file name and engine flags of a
+    benchmark run on one engine"""
+    if engine == "Native":
+        return (
+            NATIVE_ENGINE_PATH,
+            get_native_run_path(benchmark),
+            "native",
+            None,
+        )
+    return (
+        WASM_ENGINES[engine]["path"],
+        f"{SG_BENCHMARKS_BASE}" + sg_benchmarks_wasm[benchmark],
+        (
+            "wasm"
+            if len(WASM_ENGINES) == 1
+            else "wasm_" + re.sub(r"[^A-Za-z0-9_.-]", "_", engine)
+        ),
+        WASM_ENGINES[engine].get("flags"),
+    )
+
+
+def run_profile_command(cmd_string, cwd):
+    """Runs one step of a profile, raising BenchmarkFailure on failure"""
+    return run_or_fail(
+        f"profile step ({cmd_string.split(' -- ')[0]})",
+        cmd_string,
+        cwd,
+        stderr=subprocess.PIPE,
+    )
+
+
+def collapse_perf_script(perf_script_output):
+    """Folds `perf script` call stacks into the collapsed stack format used by
+    flame graphs: frames root first separated by ';', mapped to sample counts"""
+    stacks = {}
+    comm = None
+    frames = []
+    for line in perf_script_output.splitlines() + [""]:
+        if not line.strip():
+            if comm is not None:
+                stack = ";".join([comm] + frames[::-1])
+                stacks[stack] = stacks.get(stack, 0) + 1
+            comm = None
+            frames = []
+        elif not line[0].isspace():
+            comm = line.split()[0]
+        else:
+            frame = line.strip().split(None, 1)
+            frame = frame[1] if len(frame) > 1 else ""
+            symbol, _, dso = frame.rpartition(" (")
+            if not _:
+                symbol, dso = frame, ""
+            symbol = re.sub(r"\+0x[0-9a-fA-F]+$", "", symbol)
+            if symbol in ("", "[unknown]"):
+                symbol = f"[{os.path.basename(dso.rstrip(')')) or 'unknown'}]"
+            frames.append(symbol.replace(";", ":"))
+    return stacks
+
+
+def write_flame_graph(stacks, svg_path, title):
+    """Renders collapsed stacks as an SVG flame graph"""
+
+    root = {"value": 0, "children": {}}
+    for stack, count in stacks.items():
+        node = root
+        node["value"] += count
+        for frame in stack.split(";"):
+            node = node["children"].setdefault(frame, {"value": 0, "children": {}})
+            node["value"] += count
+
+    def get_depth(node):
+        return 1 + max(
+            (get_depth(child) for child in node["children"].values()), default=0
+        )
+
+    width = 1200
+    frame_height = 16
+    height = (get_depth(root) + 2) * frame_height
+    total = max(root["value"], 1)
+    rects = []
+
+    def add_frames(name, node, x_offset, depth):
+        frame_width = node["value"] / total * (width - 20)
+        if frame_width < 0.1:
+            return
+        y_offset = height - (depth + 1) * frame_height
+        hue = int(hashlib.sha1(name.encode()).hexdigest()[:4], 16)
+        color = f"rgb({205 + hue % 50},{80 + hue % 150},{hue % 55})"
+        label = (
+            name
+            if len(name) * 7 < frame_width
+            else name[: int(frame_width / 7) - 2] + ".."
+        )
+        tooltip = (
+            (f"{name} ({node['value']} samples, {node['value'] / total:.2%})")
+            .replace("&", "&amp;")
+            .replace("<", "&lt;")
+            .replace(">", "&gt;")
+        )
+        label = label.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        rects.append(
+            f'<g><title>{tooltip}</title><rect x="{x_offset + 10:.1f}" '
+            f'y="{y_offset}" width="{frame_width:.1f}" height="{frame_height - 1}" '
+            f'fill="{color}"/><text x="{x_offset + 13:.1f}" '
+            f'y="{y_offset + frame_height - 4}">'
+            f'{label if frame_width > 21 else ""}</text></g>'
+        )
+        for child_name, child in node["children"].items():
+            add_frames(child_name, child, x_offset, depth + 1)
+            x_offset += child["value"] / total * (width - 20)
+
+    add_frames("all", root, 0, 0)
+    with open(svg_path, "w", encoding="utf-8") as svg:
+        svg.write(
+            f'<?xml version="1.0" standalone="no"?>\n'
+            f'<svg version="1.1" width="{width}" height="{height}" '
+            f'xmlns="http://www.w3.org/2000/svg" font-family="monospace" '
+            f'font-size="12">\n<text x="{width / 2}" y="{frame_height}" '
+            f'text-anchor="middle" font-size="14">{title}</text>\n'
+            + "\n".join(rects)
+            + "\n</svg>\n"
+        )
+
+
+def profile_engine(benchmark, engine):
+    """Records a benchmark run on one engine under perf, with the Wasm engine's
+    JIT profiling enabled, and writes its collapsed stacks and flame graph.
+    Returns the share of self samples of each function"""
+
+    engine_path, benchmark_path, results_name, engine_flags = get_engine_run(
+        benchmark, engine
+    )
+    profile_dir = f"{SG_BENCHMARKS_BASE}/results/profile"
+    os.makedirs(profile_dir, exist_ok=True)
+    profile_path = f"{profile_dir}/{benchmark}_{results_name}"
+    strategy = ARGS_DICT["profile_strategy"]
+    if engine != "Native":
+        engine_flags = " ".join(
+            flags for flags in [engine_flags, PROFILE_ENGINE_FLAGS[strategy]] if flags
+        )
+    engine_flags_arg = (
+        f"--engine-flags={shlex.quote(engine_flags)} " if engine_flags else ""
+    )
+
+    print_verbose(f"Profiling {engine} ({benchmark}).")
+    run_profile_command(
+        f"LD_LIBRARY_PATH={os.path.dirname(engine_path)}/ "
+        f"perf record -k mono -g -F {PROFILE_FREQUENCY} -o {profile_path}.perf.data -- "
+        f"/sightglass/target/release/sightglass-cli benchmark --engine {engine_path} "
+        f"{engine_flags_arg}--processes=1 --raw --output-format csv "
+        f"--output-file {profile_path}_results.csv -- {benchmark_path}",
+        os.path.dirname(benchmark_path),
+    )
+    perf_data_path = f"{profile_path}.perf.data"
+    if strategy == "jitdump" and engine != "Native":
+        run_profile_command(
+            f"perf inject --jit -i {perf_data_path} -o {profile_path}.jit.perf.data",
+            os.path.dirname(benchmark_path),
+        )
+        perf_data_path = f"{profile_path}.jit.perf.data"
+    stacks = collapse_perf_script(
+        run_profile_command(
+            f"perf script -i {perf_data_path}", os.path.dirname(benchmark_path)
+        )
+    )
+
+    with open(f"{profile_path}.folded", "w", encoding="utf-8") as folded:
+        for stack, count in stacks.items():
+            folded.write(f"{stack} {count}\n")
+    write_flame_graph(stacks, f"{profile_path}.svg", f"{benchmark} {engine}")
+    print_verbose(f"Flame graph written to {profile_path}.svg")
+
+    self_samples = {}
+    for stack, count in stacks.items():
+        # Wasm JIT frames are named wasm[module]::function[index]::name
+        function = re.sub(r"^wasm\[\d+\]::function\[\d+\]::", "", stack.split(";")[-1])
+        self_samples[function] = self_samples.get(function, 0) + count
+    total = max(sum(self_samples.values()), 1)
+    return {function: count / total * 100 for function, count in self_samples.items()}
+
+
+def profile_benchmark(benchmark, engines):
+    """Profiles a benchmark on each engine and prints its hottest functions with
+    the engines side by side, also written to a CSV next to the flame graphs"""
+
+    import pandas as pd
+
+    hot_df = pd.DataFrame(
+        {engine: profile_engine(benchmark, engine) for engine in engines}
+    ).fillna(0)
+    hot_df = hot_df.loc[
+        hot_df.max(axis=1)
+        .sort_values(ascending=False)
+        .index[: ARGS_DICT["profile_top"]]
+    ]
+    if "Native" in hot_df and len(engines) > 1:
+        for engine in engines:
+            if engine != "Native":
+                hot_df[f"{engine} - Native"] = hot_df[engine] - hot_df["Native"]
+    hot_df.index.name = "function"
+    hot_df.to_csv(f"{SG_BENCHMARKS_BASE}/results/profile/{benchmark}_hot_functions.csv")
+    with OUTPUT_LOCK:
+        print(f"{benchmark} hot functions (% of self samples)")
+        print(hot_df.to_string(float_format="{:.2f}".format))
+        print("")
+
+
+def get_throughput_levels():
+    """Numbers of concurrent instances measured in throughput mode: powers of two
+    up to --throughput-max, which defaults to the number of available cores"""
+    max_instances = ARGS_DICT["throughput_max"] or len(os.sched_getaffinity(0))
+    levels = []
+    instances = 1
+    while instances < max_instances:
+        levels.append(instances)
+        instances *= 2
+    return levels + [max_instances]
+
+
+def run_concurrent_instances(benchmark, engine, instances):
+    """Runs concurrent copies of a benchmark on one engine, each pinned to its own
+    core while there are enough, and returns each copy's mean Execution time (ns)"""
+
+    import pandas as pd
+
+    engine_path, benchmark_path, results_name, engine_flags = get_engine_run(
+        benchmark, engine
+    )
+    available_cores = sorted(os.sched_getaffinity(0))
+    processes = []
+    for instance in range(instances):
+        output_path = (
+            f"{SG_BENCHMARKS_BASE}/results/{benchmark}_{results_name}"
+            + f"_throughput_{instance}.csv"
+        )
+        cli_cmd_string = get_sightglass_command(
+            engine_path,
+            benchmark_path,
+            "--processes=1",
+            output_path,
+            [available_cores[instance % len(available_cores)]],
+            engine_flags,
+        )
+        logging.info("Trying sightglass-cli benchmark ... %s", cli_cmd_string)
+        processes.append(
+            (
+                subprocess.Popen(
+                    cli_cmd_string,
+                    shell=True,
+                    text=True,
+                    cwd=os.path.dirname(benchmark_path),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    executable="/bin/bash",
+                    start_new_session=True,
+                ),
+                output_path,
+            )
+        )
+
+    # The instances share one deadline, and all of them are killed on any failure
+    deadline = time.monotonic() + get_timeout() if get_timeout() else None
+    try:
+        for process, output_path in processes:
+            output, _ = process.communicate(
+                timeout=deadline and max(deadline - time.monotonic(), 0)
+            )
+            logging.debug("%s", output)
+            if process.returncode:
+                raise BenchmarkFailure(
+                    f"{engine} throughput run ({instances} instances) failed "
+                    f"with error code {process.returncode}"
+                )
+    except subprocess.TimeoutExpired as error:
+        raise BenchmarkFailure(
+            f"{engine} throughput run ({instances} instances) timed out "
+            f"after {get_timeout():g}s"
+        ) from error
+    finally:
+        for process, _ in processes:
+            if process.poll() is None:
+                kill_process_group(process.pid)
+                process.communicate()
+
+    latencies = []
+    for process, output_path in processes:
+        raw_df = pd.read_csv(output_path)
+        latencies.append(
+            raw_df.loc[
+                (raw_df["phase"] == "Execution") & (raw_df["event"] == "nanoseconds"),
+                "count",
+            ].mean()
+        )
+        os.remove(output_path)
+    return latencies
+
+
+def run_throughput(benchmark, engines):
+    """Throughput mode. Runs 1, 2, 4 ... concurrent instances of a benchmark on
+    each engine and reports aggregate executions per second, the latency of each
+    instance relative to a single instance, and the scaling efficiency"""
+
+    import pandas as pd
+
+    rows = []
+    for instances in get_throughput_levels():
+        for engine in get_engine_order(benchmark, engines):
+            print_verbose(f"Running {instances} {engine} instance(s) ({benchmark}).")
+            latencies = run_concurrent_instances(benchmark, engine, instances)
+            rows.append(
+                [
+                    benchmark,
+                    engine,
+                    instances,
+                    sum(1e9 / latency for latency in latencies),
+                    sum(latencies) / len(latencies),
+                ]
+            )
+
+    throughput_df = pd.DataFrame(
+        rows,
+        columns=["benchmark", "engine", "instances", "executions_per_s", "latency"],
+    )
+    throughput_df = throughput_df.sort_values(["engine", "instances"], kind="stable")
+    single_df = throughput_df[throughput_df["instances"] == 1].set_index("engine")
+    throughput_df["latency_degradation"] = throughput_df["latency"] / throughput_df[
+        "engine"
+    ].map(single_df["latency"])
+    throughput_df["scaling_efficiency"] = throughput_df["executions_per_s"] / (
+        throughput_df["instances"]
+        * throughput_df["engine"].map(single_df["executions_per_s"])
+    )
+    throughput_df.to_csv(
+        f"{SG_BENCHMARKS_BASE}/results/{benchmark}_throughput.csv", index=False
+    )
+
+    THROUGHPUT_DF.append(throughput_df)
+    with OUTPUT_LOCK:
+        print(f"{benchmark} throughput")
+        print(
+            throughput_df.drop(columns="benchmark").to_string(
+                index=False, float_format="{:.2f}".format
+            )
+        )
+        print("")
+
+
+def parse_size(size):
+    """Number of bytes in a size such as 4096, 64K or 1M"""
+    multiplier = {"K": 1 << 10, "M": 1 << 20}.get(size[-1:].upper(), 1)
+    return int(size.rstrip("kKmM")) * multiplier
+
+
+def prepare_scaling_input(benchmark, size):
+    """Directory a scaling run of a benchmark is run in, holding the input of
+    the given size or file under the name the benchmark reads, and the number
+    of bytes in that input. Sizes are generated by repeating the benchmark's
+    own input"""
+    input_name = SCALING_INPUTS[benchmark]
+    if os.path.isfile(size):
+        with open(size, "rb") as input_file:
+            data = input_file.read()
+        label = re.sub(r"[^A-Za-z0-9_.-]", "_", os.path.basename(size))
+    else:
+        source_path = os.path.join(
+            SG_BENCHMARKS_BASE,
+            os.path.dirname(sg_benchmarks_wasm[benchmark]),
+            input_name,
+        )
+        with open(source_path, "rb") as source_file:
+            source = source_file.read()
+        size_bytes = parse_size(size)
+        data = (source * (size_bytes // len(source) + 1))[:size_bytes]
+        try:
+            source.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+        else:
+            # Keep text inputs valid UTF-8 where the cut splits a character
+            try:
+                data.decode("utf-8")
+            except UnicodeDecodeError as error:
+                data = data[: error.start]
+        label = str(size_bytes)
+
+    scaling_dir = f"{SG_BENCHMARKS_BASE}/results/scaling/{benchmark}/{label}"
+    os.makedirs(scaling_dir, exist_ok=True)
+    with open(os.path.join(scaling_dir, input_name), "wb") as input_file:
+        input_file.write(data)
+    return scaling_dir, len(data)
+
+
+def fit_scaling(engine_df):
+    """Least-squares fit of Execution time against input size: the intercept is
+    the fixed per-invocation overhead and the inverse of the slope the
+    steady-state throughput"""
+
+    import numpy as np
+
+    if engine_df["input_bytes"].nunique() < 2:
+        return float("NaN"), float("NaN"), float("NaN")
+    slope, overhead = np.polyfit(engine_df["input_bytes"], engine_df["execution"], 1)
+    fitted = overhead + slope * engine_df["input_bytes"]
+    residual = np.sum((engine_df["execution"] - fitted) ** 2)
+    total = np.sum((engine_df["execution"] - engine_df["execution"].mean()) ** 2)
+    return overhead, slope, 1 - residual / total if total else 1.0
+
+
+def run_scaling(benchmark):
+    """Scaling mode. Runs a benchmark that reads an input file over each of
+    --scaling-sizes, on every Wasm engine and natively where a native build
+    exists, and reports the throughput at each size, the Wasm/native time ratio
+    as a function of size, and per engine a fit of time against size into a
+    fixed overhead and a steady-state throughput, next to the startup
+    (Compilation + Instantiation) time"""
+
+    import pandas as pd
+    from termcolor import colored
+
+    engines = list(WASM_ENGINES)
+    if not ARGS_DICT["no_native"] and benchmark in SCALING_NATIVE_BENCHMARKS:
+        try:
+            build_native_benchmark(benchmark)
+        except BenchmarkFailure as failure:
+            FAILED_BENCHMARKS[benchmark] = str(failure)
+            print(f"Excluding {benchmark}: {failure}")
+            return
+        engines.append("Native")
+    unit = METRIC_UNITS[ARGS_DICT["metric"]]
+    throughput_column = (
+        "bytes_per_s" if ARGS_DICT["metric"] == "nanoseconds" else "bytes_per_cycle"
+    )
+    throughput_scale = 1e9 if ARGS_DICT["metric"] == "nanoseconds" else 1
+
+    rows = []
+    for size in ARGS_DICT["scaling_sizes"]:
+        scaling_dir, input_bytes = prepare_scaling_input(benchmark, size)
+        for engine in get_engine_order(benchmark, engines):
+            print_verbose(f"Running {engine} ({benchmark}, {input_bytes} bytes).")
+            engine_path, benchmark_path, results_name, engine_flags = get_engine_run(
+                benchmark, engine
+            )
+            scaling_path = os.path.join(scaling_dir, os.path.basename(benchmark_path))
+            if not os.path.lexists(scaling_path):
+                os.symlink(benchmark_path, scaling_path)
+            results_path = os.path.join(scaling_dir, f"{results_name}_results.csv")
+            try:
+                run_sightglass_benchmark(
+                    benchmark,
+                    engine_path,
+                    scaling_path,
+                    results_path,
+                    engine_flags=engine_flags,
+                )
+            except BenchmarkFailure as failure:
+                FAILED_BENCHMARKS[benchmark] = (
+                    f"{engine} {failure} ({input_bytes} bytes)"
+                )
+                print(f"Excluding {benchmark}: {FAILED_BENCHMARKS[benchmark]}")
+                return
+            summary_df = summarize_results(
+                results_path,
+                os.path.join(scaling_dir, f"{results_name}_summarized.csv"),
+            )
+            phase_times = summary_df[
+                summary_df["event"] == ARGS_DICT["metric"]
+            ].set_index("phase")[ARGS_DICT["statistic"]]
+            rows.append(
+                [
+                    benchmark,
+                    engine,
+                    input_bytes,
+                    phase_times["Execution"],
+                    phase_times["Compilation"] + phase_times["Instantiation"],
+                ]
+            )
+
+    scaling_df = pd.DataFrame(
+        rows, columns=["benchmark", "engine", "input_bytes", "execution", "startup"]
+    ).sort_values(["engine", "input_bytes"], kind="stable")
+    scaling_df[throughput_column] = (
+        scaling_df["input_bytes"] / scaling_df["execution"] * throughput_scale
+    )
+    if "Native" in engines:
+        native_execution = (
+            scaling_df[scaling_df["engine"] == "Native"]
+            .groupby("input_bytes")["execution"]
+            .mean()
+        )
+        scaling_df["native_ratio"] = scaling_df["execution"] / scaling_df[
+            "input_bytes"
+        ].map(native_execution)
+
+    fit_rows = []
+    unmeasurable = []
+    for engine, engine_df in scaling_df.groupby("engine", sort=False):
+        overhead, slope, r2 = fit_scaling(engine_df)
+        if slope <= 0:
+            # Time not growing with size is noise, not an infinite throughput
+            unmeasurable.append(engine)
+            slope = float("NaN")
+        fit_rows.append(
+            [
+                engine,
+                overhead,
+                throughput_scale / slope,
+                engine_df["startup"].mean(),
+                r2,
+            ]
+        )
+    fit_df = pd.DataFrame(
+        fit_rows,
+        columns=["engine", "overhead", throughput_column, "startup", "r2"],
+    )
+    if "Native" in engines:
+        native_fit = fit_df.set_index("engine").loc["Native"]
+        fit_df["overhead_ratio"] = fit_df["overhead"] / native_fit["overhead"]
+        fit_df["per_byte_ratio"] = (
+            native_fit[throughput_column] / fit_df[throughput_column]
+        )
+        fit_df["startup_ratio"] = fit_df["startup"] / native_fit["startup"]
+
+    scaling_df.to_csv(
+        f"{SG_BENCHMARKS_BASE}/results/{benchmark}_scaling.csv", index=False
+    )
+    SCALING_DF.append(scaling_df)
+    with OUTPUT_LOCK:
+        print("")
+        print(
+            colored(
+                f"{benchmark} input scaling ({ARGS_DICT['statistic']} {unit})",
+                "green",
+                attrs=["bold"],
+            )
+        )
+        print(
+            scaling_df.drop(columns="benchmark").to_string(
+                index=False, float_format="{:.2f}".format
+            )
+        )
+        print("")
         print(
-            f"Running sightglass-cli benchmark failed with error code {error.returncode}"
+            colored(
+                f"{benchmark} fit: execution = overhead + input_bytes / {throughput_column}",
+                "green",
+                attrs=["bold"],
+            )
+        )
+        print(fit_df.to_string(index=False, float_format="{:.3f}".format))
+        print("")
+        if unmeasurable:
+            FAILED_BENCHMARKS[benchmark] = (
+                f"{', '.join(unmeasurable)} {throughput_column} not measurable: "
+                "execution time does not grow with input size (try larger sizes)"
+            )
+            print(f"{benchmark}: {FAILED_BENCHMARKS[benchmark]}")
+            print("")
+
+
+def collect_perf_counters(
+    benchmark, engine_path, benchmark_path, results_name, cores=None, engine_flags=None
+):
+    """Runs a benchmark under sightglass's perf-counters measure and returns the
+    mean of each counter per phase, with instructions per cycle and misses per
+    kilo-instruction derived from them"""
+
+    results_path = (
+        f"{SG_BENCHMARKS_BASE}/results/{benchmark}_{results_name}_counters.csv"
+    )
+    results_summarized_path = (
+        f"{SG_BENCHMARKS_BASE}/results/{benchmark}"
+        + f"_counters_{results_name}_summarized.csv"
+    )
+    run_sightglass_benchmark(
+        benchmark,
+        engine_path,
+        benchmark_path,
+        results_path,
+        cores,
+        engine_flags,
+        "perf-counters",
+    )
+
+    summary_df = summarize_results(results_path, results_summarized_path)
+    counters_df = summary_df.pivot(index="phase", columns="event", values="mean")
+    counters_df.columns = [
+        PERF_COUNTER_EVENTS.get(event, event.replace("-", "_").lower())
+        for event in counters_df.columns
+    ]
+    if "instructions" in counters_df:
+        if "cpu_cycles" in counters_df:
+            counters_df["ipc"] = counters_df["instructions"] / counters_df["cpu_cycles"]
+        for event in [event for event in counters_df if event.endswith("_misses")]:
+            counters_df[event.replace("_misses", "_mpki")] = (
+                counters_df[event] * 1000 / counters_df["instructions"]
+            )
+    return counters_df.reset_index()
+
+
+def print_high_cv(benchmark, high_cv_df):
+    """Warns about results whose coefficient of variation exceeds --cv-threshold,
+    a sign of noise or of a multimodal distribution the mean and median hide"""
+
+    from termcolor import colored
+
+    noisy_results = ", ".join(
+        f"{engine} {phase} {cv:.1%}"
+        for engine, phase, cv in high_cv_df[["engine", "phase", "cv"]].itertuples(
+            index=False
+        )
+    )
+    with OUTPUT_LOCK:
+        print_verbose(
+            colored(
+                f"Warning: high variation in {benchmark} (CV): {noisy_results}",
+                "yellow",
+            )
+        )
+
+
+def print_failed_benchmarks():
+    """Reports the benchmarks that failed and were excluded from the results and
+    scores of this run"""
+
+    from termcolor import colored
+
+    print("")
+    print(
+        colored(
+            f"Excluded {len(FAILED_BENCHMARKS)} failed benchmark(s):",
+            "red",
+            attrs=["bold"],
+        )
+    )
+    for benchmark, failure in FAILED_BENCHMARKS.items():
+        print(f"  {benchmark}: {failure}")
+    print("")
+
+
+def print_perf_counters(benchmark, benchmark_df):
+    """Prints the derived counters of a benchmark with engines side by side, and
+    names those the perf-counters measure did not provide the events for"""
+
+    derived_columns = [
+        column
+        for column in PERF_COUNTER_DERIVED
+        if column in benchmark_df and benchmark_df[column].notna().any()
+    ]
+    unavailable = [
+        label
+        for column, label in PERF_COUNTER_DERIVED.items()
+        if column not in derived_columns
+    ]
+    with OUTPUT_LOCK:
+        print(f"{benchmark} perf counters")
+        if derived_columns:
+            counters_df = benchmark_df.pivot(
+                index="phase", columns="engine", values=derived_columns
+            ).reindex(benchmark_df["phase"].unique())
+            counters_df.columns = [
+                f"{column} {engine}" for column, engine in counters_df
+            ]
+            print(counters_df.to_string(float_format="{:.3f}".format))
+        if unavailable:
+            print(
+                f"Not available from sightglass perf-counters: {', '.join(unavailable)}"
+            )
+        print("")
+
+
+def collect_engine_results(
+    benchmark,
+    engine,
+    engine_path,
+    benchmark_path,
+    results_name,
+    cores=None,
+    engine_flags=None,
+):
+    """Runs a benchmark on one engine and returns its summarized results"""
+
+    results_path = (
+        f"{SG_BENCHMARKS_BASE}/results/{benchmark}_{results_name}_results.csv"
+    )
+    logging.debug("results_path ... %s", results_path)
+
+    results_summarized_path = (
+        f"{SG_BENCHMARKS_BASE}/results/{benchmark}"
+        + f"_results_{results_name}_summarized.csv"
+    )
+    logging.debug("results_summarized_path ... %s", results_summarized_path)
+
+    results_summarized_transposed_path = (
+        f"{SG_BENCHMARKS_BASE}/results/{benchmark}"
+        + f"_results_{results_name}_summarized_transposed.csv"
+    )
+    logging.debug(
+        "results_summarized_transposed_path ... %s",
+        results_summarized_transposed_path,
+    )
+
+    logging.info("Trying sightglass-cli benchmark for %s ... ", engine)
+    memory_usage = run_sightglass_benchmark(
+        benchmark, engine_path, benchmark_path, results_path, cores, engine_flags
+    )
+
+    logging.info("Summarizing %s results ... %s", engine, results_path)
+    summary_df = summarize_results(results_path, results_summarized_path)
+    if summary_df.empty:
+        raise BenchmarkFailure("execution did not produce any results")
+
+    logging.info("Trying printing %s benchmark results ...", engine)
+    summary_df = summary_df[summary_df["event"] == ARGS_DICT["metric"]]
+    summary_df[["phase", ARGS_DICT["statistic"]]].to_csv(
+        results_summarized_transposed_path, header=False, index=False
+    )
+
+    engine_df = summary_df[RESULT_COLUMNS]
+    engine_df = engine_df.rename(columns={"wasm": "benchmark"})
+    engine_df.loc[:, ["engine"]] = engine
+    engine_df.loc[:, ["benchmark"]] = f"{benchmark}"
+    engine_df["cached"] = results_path in RESULT_CACHE_HITS
+    if memory_usage:
+        for column, value in memory_usage.items():
+            engine_df[column] = value
+    if ARGS_DICT["perf_counters"]:
+        logging.info("Collecting %s perf counters ...", engine)
+        engine_df = engine_df.merge(
+            collect_perf_counters(
+                benchmark,
+                engine_path,
+                benchmark_path,
+                results_name,
+                cores,
+                engine_flags,
+            ),
+            on="phase",
+            how="left",
+        )
+
+    with OUTPUT_LOCK:
+        if not ARGS_DICT["quiet"]:
+            termgraph_title = (
+                f"{benchmark} {results_name} {METRIC_UNITS[ARGS_DICT['metric']]}"
+            )
+            os.system(
+                f"termgraph {results_summarized_transposed_path} "
+                f'--title "{termgraph_title}" --color blue'
+            )
+        else:
+            print(engine_df.to_csv(index=False, header=None, sep=","))
+    return engine_df
+
+
+def get_engine_order(benchmark, engines):
+    """Order to run engines in for a benchmark. The starting engine rotates from
+    one benchmark to the next so that no engine is systematically measured
+    first, interleaving the engines over the run to spread out drift"""
+    offset = list(sg_benchmarks_wasm).index(benchmark) % len(engines)
+    return engines[offset:] + engines[:offset]
+
+
+def run_benchmark_engines(benchmark, run_native, cores=None):
+    """Runs a benchmark on every Wasm engine, and natively where supported,
+    along with its profile and throughput runs when asked for, and returns each
+    engine's results. Raises BenchmarkFailure naming the failed engine or step"""
+    engines = list(WASM_ENGINES)
+    if run_native and sg_benchmarks_native.get(benchmark):
+        build_native_benchmark(benchmark)
+        engines.append("Native")
+    elif run_native:
+        print_verbose(f"Native {benchmark} is not supported")
+
+    engine_dfs = {}
+    for engine in get_engine_order(benchmark, engines):
+        if engine == "Native":
+            print_verbose(f"Collecting Native ({benchmark}){format_cores_note(cores)}.")
+        else:
+            engine_note = "" if len(WASM_ENGINES) == 1 else f", {engine}"
+            print_verbose(
+                f"Collecting Wasm ({benchmark}{engine_note}){format_cores_note(cores)}."
+            )
+        engine_path, benchmark_path, results_name, engine_flags = get_engine_run(
+            benchmark, engine
+        )
+        try:
+            engine_dfs[engine] = collect_engine_results(
+                benchmark,
+                engine,
+                engine_path,
+                benchmark_path,
+                results_name,
+                cores,
+                engine_flags,
+            )
+        except BenchmarkFailure as failure:
+            raise BenchmarkFailure(f"{engine} {failure}") from failure
+
+    if ARGS_DICT["profile"]:
+        profile_benchmark(benchmark, engines)
+
+    if ARGS_DICT["throughput"]:
+        run_throughput(benchmark, engines)
+
+    return engine_dfs
+
+
+def run_benchmarks(benchmark, run_native=False, cores=None):
+    """Runs the benchmark on native, if requested, and on every registered Wasm
+    engine, pinned to the given cores if any"""
+
+    import pandas as pd
+
+    journaled_df = get_journaled_results(benchmark, run_native)
+    if journaled_df is not None:
+        print_verbose(f"Reusing journaled results ({benchmark}).")
+        BENCHMARK_DF.append(journaled_df)
+        return journaled_df
+
+    logging.info("Running benchmark ...")
+    logging.info("Run native ... %s", run_native)
+
+    results_dir = f"{SG_BENCHMARKS_BASE}/results/"
+
+    create_results_path_cmd_string = f"mkdir -p {results_dir}"
+    try:
+        logging.info(
+            "Trying mkdir for results_path ... %s", create_results_path_cmd_string
+        )
+        output = subprocess.check_output(
+            create_results_path_cmd_string,
+            shell=True,
+            text=True,
+            stderr=subprocess.STDOUT,
+        )
+        logging.debug("%s", output)
+    except subprocess.CalledProcessError as error:
+        print(f"mkdir for build folder failed with error code {error.returncode}")
+        sys.exit(error.returncode)
+
+    try:
+        engine_dfs = run_benchmark_engines(benchmark, run_native, cores)
+    except BenchmarkFailure as failure:
+        # Exclude the benchmark from every engine's results so scores
+        # stay comparable, and carry on with the rest of the run
+        FAILED_BENCHMARKS[benchmark] = str(failure)
+        with OUTPUT_LOCK:
+            print(f"Excluding {benchmark}: {failure}")
+        return None
+
+    native_df = engine_dfs.pop("Native", None)
+    benchmark_df = pd.concat([engine_dfs[engine] for engine in WASM_ENGINES])
+
+    if isinstance(native_df, pd.DataFrame):
+        logging.info("Getting efficiency ... ")
+        benchmark_df["efficiency"] = float("NaN")
+        benchmark_df = pd.concat([native_df, benchmark_df])
+        for phase in EFFICIENCY_PHASES:
+            native_mean = native_df[native_df["phase"].str.match(phase)].iloc[0][
+                ARGS_DICT["statistic"]
+            ]
+            for engine, wasm_df in engine_dfs.items():
+                wasm_mean = wasm_df[wasm_df["phase"].str.match(phase)].iloc[0][
+                    ARGS_DICT["statistic"]
+                ]
+                benchmark_df.loc[
+                    (benchmark_df["phase"] == phase)
+                    & (benchmark_df["engine"] == engine),
+                    "efficiency",
+                ] = (
+                    native_mean / wasm_mean
+                )
+            # The native row carries the inverse ratio against the first engine
+            wasm_df = engine_dfs[list(WASM_ENGINES)[0]]
+            wasm_mean = wasm_df[wasm_df["phase"].str.match(phase)].iloc[0][
+                ARGS_DICT["statistic"]
+            ]
+            benchmark_df.loc[
+                (benchmark_df["phase"] == phase) & (benchmark_df["engine"] == "Native"),
+                "efficiency",
+            ] = (
+                wasm_mean / native_mean
+            )
+
+        if "peak_rss_kb" in benchmark_df:
+            logging.info("Getting memory efficiency ... ")
+            native_rss = native_df["peak_rss_kb"].iloc[0]
+            for engine, wasm_df in engine_dfs.items():
+                benchmark_df.loc[
+                    benchmark_df["engine"] == engine, "memory_efficiency"
+                ] = (native_rss / wasm_df["peak_rss_kb"].iloc[0])
+            # The native row carries the inverse ratio against the first engine
+            wasm_df = engine_dfs[list(WASM_ENGINES)[0]]
+            benchmark_df.loc[
+                benchmark_df["engine"] == "Native", "memory_efficiency"
+            ] = (wasm_df["peak_rss_kb"].iloc[0] / native_rss)
+
+    benchmark_df["high_cv"] = benchmark_df["cv"] > ARGS_DICT["cv_threshold"]
+    if benchmark_df["high_cv"].any():
+        print_high_cv(benchmark, benchmark_df[benchmark_df["high_cv"]])
+
+    if ARGS_DICT["perf_counters"] and not ARGS_DICT["quiet"]:
+        print_perf_counters(benchmark, benchmark_df)
+
+    if cores:
+        benchmark_df["cores"] = format_cores(cores)
+
+    if isinstance(benchmark_df, pd.DataFrame):
+        BENCHMARK_DF.append(benchmark_df)
+        stream_results(benchmark_df)
+        journal_results(benchmark, run_native, benchmark_df)
+    return benchmark_df
+
+
+def format_cores(cores):
+    """Format a core set the way taskset expects it, e.g. 0,1,2"""
+    return ",".join(str(core) for core in cores)
+
+
+def format_cores_note(cores):
+    """Short note on where a benchmark is pinned, empty when not pinned"""
+    return f" on cores {format_cores(cores)}" if cores else ""
+
+
+def get_core_sets(jobs):
+    """Split the cores available to this process into disjoint sets, one per job"""
+    available_cores = sorted(os.sched_getaffinity(0))
+    jobs = max(1, min(jobs, len(available_cores)))
+    cores_per_job = len(available_cores) // jobs
+    return [
+        available_cores[job * cores_per_job : (job + 1) * cores_per_job]
+        for job in range(jobs)
+    ]
+
+
+def run_benchmark_list(benchmark_list):
+    """Runs a list of (benchmark, run_native) pairs. With --jobs greater than 1,
+    independent benchmarks run concurrently, each pinned to its own core set.
+    Returns the benchmark data frames in the order given"""
+
+    jobs = ARGS_DICT["jobs"]
+    if jobs <= 1 or len(benchmark_list) <= 1:
+        return [
+            run_benchmarks(benchmark, run_native)
+            for benchmark, run_native in benchmark_list
+        ]
+
+    core_sets = queue.Queue()
+    for core_set in get_core_sets(jobs):
+        core_sets.put(core_set)
+    logging.info("Running %d jobs concurrently ...", core_sets.qsize())
+
+    def run_pinned(benchmark, run_native):
+        cores = core_sets.get()
+        try:
+            return run_benchmarks(benchmark, run_native, cores)
+        finally:
+            core_sets.put(cores)
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=core_sets.qsize()
+    ) as executor:
+        futures = [
+            executor.submit(run_pinned, benchmark, run_native)
+            for benchmark, run_native in benchmark_list
+        ]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def geo_mean_overflow(iterable):
+    """Helper function to avoid overflow errors during geo-mean calculation"""
+
+    import numpy as np
+
+    calc = np.log(iterable)
+    return np.exp(calc.mean())
+
+
+def summarize_suite_engine(suite_name, suite_df, engine):
+    """Suite summary of one Wasm engine: geo-mean phase times and mean efficiency"""
+
+    import pandas as pd
+
+    statistic = ARGS_DICT["statistic"]
+    suite_wasm_time_slice_df = pd.DataFrame(
+        suite_df.loc[
+            (suite_df["phase"] == "Execution") & (suite_df["engine"] == engine),
+            statistic,
+        ]
+    )
+
+    suite_wasm_time_mean = geo_mean_overflow(suite_wasm_time_slice_df.loc[:, statistic])
+    suite_summary_df = pd.DataFrame(
+        [[f"{suite_name}", engine, suite_wasm_time_mean]],
+        columns=["suite", "engine", "time"],
+    )
+
+    # Cold start times: geo-means of the Compilation and Instantiation phases
+    suite_wasm_phase_df = suite_df[suite_df["engine"] == engine].pivot_table(
+        index="benchmark", columns="phase", values=statistic
+    )
+    if {"Compilation", "Instantiation"} <= set(suite_wasm_phase_df.columns):
+        suite_summary_df["compilation_time"] = [
+            geo_mean_overflow(suite_wasm_phase_df["Compilation"])
+        ]
+        suite_summary_df["instantiation_time"] = [
+            geo_mean_overflow(suite_wasm_phase_df["Instantiation"])
+        ]
+        suite_summary_df["cold_start_time"] = [
+            geo_mean_overflow(
+                suite_wasm_phase_df["Compilation"]
+                + suite_wasm_phase_df["Instantiation"]
+            )
+        ]
+
+    if "efficiency" in suite_df:
+        suite_wasm_efficiency_avg = suite_df.loc[
+            (suite_df["engine"] == engine) & (suite_df["phase"] == "Execution"),
+            "efficiency",
+        ].mean()
+        suite_summary_df["efficiency"] = [suite_wasm_efficiency_avg]
+        suite_summary_df["instantiation_efficiency"] = [
+            suite_df.loc[
+                (suite_df["engine"] == engine) & (suite_df["phase"] == "Instantiation"),
+                "efficiency",
+            ].mean()
+        ]
+
+    if "memory_efficiency" in suite_df:
+        suite_summary_df["peak_rss_kb"] = [
+            geo_mean_overflow(
+                suite_df.loc[
+                    (suite_df["engine"] == engine) & (suite_df["phase"] == "Execution"),
+                    "peak_rss_kb",
+                ]
+            )
+        ]
+        suite_summary_df["memory_efficiency"] = [
+            suite_df.loc[
+                (suite_df["engine"] == engine) & (suite_df["phase"] == "Execution"),
+                "memory_efficiency",
+            ].mean()
+        ]
+    return suite_summary_df
+
+
+def run_suites(suite_name, run_native=False):
+    """Benchmark a suite"""
+
+    import pandas as pd
+    from termcolor import colored
+
+    logging.info("Running suite ...")
+    print_verbose("")
+    print_verbose(
+        colored(
+            f"Benchmarking {suite_name}: {perf_suites[suite_name]}",
+            "green",
+            attrs=["bold"],
+        )
+    )
+
+    suite_df = None
+
+    benchmark_dfs = run_benchmark_list(
+        [
+            (benchmark, ARGS_DICT["native"] or run_native)
+            for benchmark in perf_suites[suite_name]
+        ]
+    )
+    benchmark_dfs = [
+        benchmark_df for benchmark_df in benchmark_dfs if benchmark_df is not None
+    ]
+    if benchmark_dfs:
+        suite_df = pd.concat(benchmark_dfs)
+    excluded = [
+        benchmark
+        for benchmark in perf_suites[suite_name]
+        if benchmark in FAILED_BENCHMARKS
+    ]
+    if excluded:
+        print(
+            f"{suite_name} is scored over {len(benchmark_dfs)} of "
+            f"{len(perf_suites[suite_name])} benchmarks, excluding {', '.join(excluded)}"
+        )
+
+    if not isinstance(suite_df, pd.DataFrame):
+        return [None, None]
+
+    suite_summary_df = pd.concat(
+        [
+            summarize_suite_engine(suite_name, suite_df, engine)
+            for engine in suite_df["engine"].unique()
+            if engine != "Native"
+        ]
+    )
+    suite_df.insert(0, "suite", f"{suite_name}")
+
+    SUITE_DF.append(suite_df)
+    return suite_summary_df
+
+
+def run_wasmscore():
+    """WasmScore test. Runs a collection of suites, both Wasm and native benchmarks
+    by default, and reports out a Wasm performance score based a geo-mean of the
+    performances of the benchmark suites. The test also reports a Wasm efficiency based
+    on Wasm's performance relative to native."""
+
+    import pandas as pd
+    from termcolor import colored
+
+    logging.info("Running WasmScore test ... ")
+
+    wasmscore_summary_df = None
+    for suite in WASMSCORE_SUITES:
+        suite_summary_df = run_suites(suite, not ARGS_DICT["no_native"])
+        if isinstance(suite_summary_df, pd.DataFrame):
+            wasmscore_summary_df = pd.concat([wasmscore_summary_df, suite_summary_df])
+
+    if isinstance(wasmscore_summary_df, pd.DataFrame):
+        print_verbose("")
+        print_verbose(
+            colored(
+                wasmscore_summary_df.reset_index(drop=True).to_string(index=False),
+                "green",
+                attrs=["bold"],
+            )
+        )
+        print_verbose("")
+
+        for engine, engine_summary_df in wasmscore_summary_df.groupby(
+            "engine", sort=False
+        ):
+            print_engine_scores(engine, engine_summary_df)
+        print("")
+
+
+def print_engine_scores(engine, engine_summary_df):
+    """Print the final scores of one Wasm engine from its suite summaries"""
+
+    engine_note = "" if len(WASM_ENGINES) == 1 else f" [{engine}]"
+    if ARGS_DICT["metric"] != "nanoseconds":
+        engine_note += f" ({ARGS_DICT['metric']})"
+    if "efficiency" in engine_summary_df:
+        print_score(
+            f"Wasm Efficiency Score{engine_note}",
+            engine_summary_df.loc[:, "efficiency"].mean(),
+        )
+
+    print_score(
+        f"Wasm Execution Score{engine_note}",
+        1 / geo_mean_overflow(engine_summary_df.loc[:, "time"]) * WASMSCORE_CONSTANT,
+    )
+
+    if "cold_start_time" in engine_summary_df:
+        for score_name, column in [
+            ("Wasm Compilation Score", "compilation_time"),
+            ("Wasm Instantiation Score", "instantiation_time"),
+            ("Wasm Cold Start Score", "cold_start_time"),
+        ]:
+            print_score(
+                f"{score_name}{engine_note}",
+                1
+                / geo_mean_overflow(engine_summary_df.loc[:, column])
+                * WASMSCORE_CONSTANT,
+            )
+
+    if "instantiation_efficiency" in engine_summary_df:
+        print_score(
+            f"Wasm Instantiation Efficiency Score{engine_note}",
+            engine_summary_df.loc[:, "instantiation_efficiency"].mean(),
+        )
+
+    if "memory_efficiency" in engine_summary_df:
+        print_score(
+            "Wasm Memory Efficiency Score"
+            + ("" if len(WASM_ENGINES) == 1 else f" [{engine}]"),
+            engine_summary_df.loc[:, "memory_efficiency"].mean(),
+        )
+
+
+def print_score(score_name, score):
+    """Print a final score line"""
+
+    from termcolor import colored
+
+    print(
+        colored(
+            "{} (Higher Better): {:.2f}".format(score_name, score),
+            "green",
+            attrs=["bold"],
+        )
+    )
+
+
+def run_simdscore():
+    """SimdScore test: Benchmarks scalar and simd version of select benchmarks and
+    reports a Wasm's scalar and simd performance score based on a geo-mean of
+    the performances of the benchmarks. The test also reports a Wasm simd efficiency
+    score calculated using Wasm's simd speed-up relative to native."""
+
+    import pandas as pd
+    from termcolor import colored
+
+    logging.info("Running SimdScore test ...")
+
+    for pair, (scalar, simd) in SIMD_PAIRS.items():
+        unbuilt = [
+            sg_benchmarks_wasm[benchmark]
+            for benchmark in (scalar, simd)
+            if not is_wasm_built(benchmark)
+        ]
+        if unbuilt:
+            failure = f"{', '.join(unbuilt)} not built (see benchmarks/build.sh)"
+            print(f"Skipping SIMD pair {pair}: {failure}")
+            FAILED_BENCHMARKS[pair] = failure
+            perf_suites["scalar-simdscore"].remove(scalar)
+            perf_suites["simd-simdscore"].remove(simd)
+
+    run_native = not ARGS_DICT["no_native"]
+    if run_native and platform.machine().lower() not in SIMD_NATIVE_MACHINES:
+        print(
+            f"Native SIMD builds need an x86 host, not {platform.machine()}: "
+            "scoring Wasm only"
+        )
+        run_native = False
+    if run_native:
+        try:
+            for suite in SIMDSCORE_SUITES:
+                for benchmark in perf_suites[suite]:
+                    if benchmark in sg_benchmarks_native:
+                        build_native_benchmark(benchmark)
+        except BenchmarkFailure as failure:
+            print(f"Native SIMD builds are unavailable ({failure}): scoring Wasm only")
+            run_native = False
+
+    simdscore_summary_df = None
+    for suite in SIMDSCORE_SUITES:
+        suite_summary_df = run_suites(suite, run_native)
+        if isinstance(suite_summary_df, pd.DataFrame):
+            simdscore_summary_df = pd.concat([simdscore_summary_df, suite_summary_df])
+
+    if isinstance(simdscore_summary_df, pd.DataFrame):
+        print_verbose("")
+        print_verbose(
+            colored(
+                simdscore_summary_df.reset_index(drop=True).to_string(index=False),
+                "green",
+                attrs=["bold"],
+            )
+        )
+        print_verbose("")
+
+        suite_df = SUITE_DF.to_frame()
+        simd_speedup_df = get_simd_speedups(
+            suite_df[suite_df["suite"].isin(SIMDSCORE_SUITES)]
+        )
+        if not simd_speedup_df.empty:
+            print_verbose(
+                colored(simd_speedup_df.to_string(index=False), "green", attrs=["bold"])
+            )
+            print_verbose("")
+
+        for engine, engine_summary_df in simdscore_summary_df.groupby(
+            "engine", sort=False
+        ):
+            engine_note = "" if len(WASM_ENGINES) == 1 else f" [{engine}]"
+            for score_name, suite in [
+                ("Wasm Scalar Score", "scalar-simdscore"),
+                ("Wasm SIMD Score", "simd-simdscore"),
+            ]:
+                suite_time = engine_summary_df.loc[
+                    engine_summary_df["suite"] == suite, "time"
+                ]
+                if not suite_time.empty:
+                    print_score(
+                        f"{score_name}{engine_note}",
+                        1 / suite_time.iloc[0] * WASMSCORE_CONSTANT,
+                    )
+            engine_speedup_df = simd_speedup_df[simd_speedup_df["engine"] == engine]
+            if not engine_speedup_df.empty:
+                print_score(
+                    f"Wasm SIMD Speed-up Score{engine_note}",
+                    geo_mean_overflow(engine_speedup_df["wasm_speedup"]),
+                )
+            if "simd_efficiency" in engine_speedup_df:
+                simd_efficiency = engine_speedup_df["simd_efficiency"].dropna()
+                if not simd_efficiency.empty:
+                    print_score(
+                        f"Wasm SIMD Efficiency Score{engine_note}",
+                        geo_mean_overflow(simd_efficiency),
+                    )
+        print("")
+    else:
+        # Nothing to score is a failed run, not an empty success
+        FAILED_BENCHMARKS["SimdScore"] = "no SIMD pair produced results"
+
+
+def get_simd_speedups(suite_df):
+    """Execution speed-up of the SIMD over the scalar variant of every SIMD
+    pair on each Wasm engine, and, where both variants have native builds, the
+    native speed-up and the Wasm speed-up relative to it (SIMD efficiency)"""
+
+    import pandas as pd
+
+    execution_df = suite_df[suite_df["phase"] == "Execution"].pivot_table(
+        index="benchmark", columns="engine", values=ARGS_DICT["statistic"]
+    )
+    rows = []
+    for pair, (scalar, simd) in SIMD_PAIRS.items():
+        # Pairs with a failed variant are left out of the scores
+        if scalar not in execution_df.index or simd not in execution_df.index:
+            continue
+        native_speedup = float("NaN")
+        if "Native" in execution_df:
+            native_speedup = (
+                execution_df.loc[scalar, "Native"] / execution_df.loc[simd, "Native"]
+            )
+        for engine in execution_df.columns:
+            if engine == "Native":
+                continue
+            row = {
+                "pair": pair,
+                "engine": engine,
+                "wasm_speedup": execution_df.loc[scalar, engine]
+                / execution_df.loc[simd, engine],
+            }
+            if "Native" in execution_df:
+                row["native_speedup"] = native_speedup
+                row["simd_efficiency"] = row["wasm_speedup"] / native_speedup
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def run_quickrun_wasmscore():
+    """SimdScore test: Benchmarks scalar and simd version of select benchmarks and
+    reports a Wasm's scalar and simd performance score based on a geo-mean of
+    the performances of the benchmarks. The test also reports a Wasm simd efficiency
+    score calculated using Wasm's simd speed-up relative to native."""
+    logging.info("Running QuickRun-WasmScore ...")
+    global DEFAULT_BENCH_PROCESS_NUM
+    DEFAULT_BENCH_PROCESS_NUM = 1
+    run_wasmscore()
+
+
+def run_quickrun_simdscore():
+    """SimdScore test: Benchmarks scalar and simd version of select benchmarks and
+    reports a Wasm's scalar and simd performance score based on a geo-mean of
+    the performances of the benchmarks. The test also reports a Wasm simd efficiency
+    score calculated using Wasm's simd speed-up relative to native."""
+
+    logging.info("Running QuickRun-SimdScore ...")
+    global DEFAULT_BENCH_PROCESS_NUM
+    DEFAULT_BENCH_PROCESS_NUM = 1
+    run_simdscore()
+
+
+def run_quickrun_all():
+    """SimdScore test: Benchmarks scalar and simd version of select benchmarks and
+    reports a Wasm's scalar and simd performance score based on a geo-mean of
+    the performances of the benchmarks. The test also reports a Wasm simd efficiency
+    score calculated using Wasm's simd speed-up relative to native."""
+
+    logging.info("Running QuickRun-All ...")
+    global DEFAULT_BENCH_PROCESS_NUM
+    DEFAULT_BENCH_PROCESS_NUM = 1
+    benchmark_list = [(bench, True) for bench in sg_benchmarks_native.keys()]
+    for bench in sg_benchmarks_wasm.keys():
+        if bench not in sg_benchmarks_native:
+            benchmark_list.append((bench, False))
+    for bench, _ in benchmark_list:
+        if not is_wasm_built(bench):
+            print(f"Skipping {bench}: {sg_benchmarks_wasm[bench]} not built")
+    run_benchmark_list(
+        [(bench, native) for bench, native in benchmark_list if is_wasm_built(bench)]
+    )
+
+
+def get_wasmscore_weights():
+    """Weight of each benchmark's log Execution time in the log of the Wasm
+    Execution Score: suites weigh the same, and benchmarks the same within
+    their suite"""
+    suites = [suite for suite in WASMSCORE_SUITES if perf_suites[suite]]
+    weights = {}
+    for suite in suites:
+        for benchmark in perf_suites[suite]:
+            weights[benchmark] = weights.get(benchmark, 0) + 1 / (
+                len(suites) * len(perf_suites[suite])
+            )
+    return weights
+
+
+def load_time_budget_history(benchmarks, engine):
+    """This host's recent history of an engine: the log Execution time of each
+    benchmark per run, the seconds one sightglass-cli process of each benchmark
+    takes, and the per-sample coefficient of variation of its Execution time"""
+
+    import numpy as np
+    import pandas as pd
+
+    host = get_host_fingerprint()
+    connection = open_history_db()
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(results)")]
+    history_df = pd.read_sql_query(
+        f"SELECT run_id, benchmark, phase, mean, "
+        f"{'cv' if 'cv' in columns else 'NULL AS cv'} FROM results "
+        "WHERE host = ? AND engine = ? AND metric = 'nanoseconds' "
+        "AND run_id IN (SELECT run_id FROM results WHERE host = ? AND engine = ? "
+        "AND metric = 'nanoseconds' GROUP BY run_id ORDER BY MAX(timestamp) DESC "
+        "LIMIT ?)",
+        connection,
+        params=[host, engine, host, engine, ARGS_DICT["history_runs"]],
+    )
+    connection.close()
+    history_df = history_df[history_df["benchmark"].isin(benchmarks)]
+    execution_df = history_df[history_df["phase"] == "Execution"]
+
+    log_times = np.log(
+        execution_df.pivot_table(index="run_id", columns="benchmark", values="mean")
+    ).reindex(columns=benchmarks)
+    # Every iteration compiles, instantiates and executes the module
+    process_seconds = (
+        history_df.groupby(["run_id", "benchmark"])["mean"]
+        .sum()
+        .groupby("benchmark")
+        .median()
+        .reindex(benchmarks)
+        * TIME_BUDGET_ITERATIONS_PER_PROCESS
+        / 1e9
+        + TIME_BUDGET_PROCESS_OVERHEAD
+    )
+    sample_cvs = (
+        pd.to_numeric(execution_df["cv"])
+        .groupby(execution_df["benchmark"])
+        .median()
+        .reindex(benchmarks)
+        .fillna(ARGS_DICT["cv_threshold"])
+    )
+    return log_times, process_seconds, sample_cvs
+
+
+def get_log_time_covariance(log_times):
+    """Covariance of the benchmarks' log Execution times across runs, shrunk
+    towards its diagonal as there are typically few runs per benchmark"""
+
+    import numpy as np
+
+    covariance = log_times.cov(min_periods=TIME_BUDGET_MIN_RUNS).fillna(0).to_numpy()
+    benchmark_num = len(log_times.columns)
+    shrinkage = benchmark_num / (benchmark_num + len(log_times))
+    variances = np.diag(covariance)
+    covariance = (1 - shrinkage) * covariance + shrinkage * np.diag(variances)
+    return covariance + np.eye(benchmark_num) * 1e-12
+
+
+def get_prediction_variance(covariance, weights, sample_variances, processes):
+    """Variance of the log Wasm Execution Score predicted from the benchmarks
+    measured with the given process counts (0 when not measured): what the
+    measured benchmarks leave unexplained of the others, plus their own
+    sampling noise. Also returns the gain predicting the log times of the
+    unmeasured benchmarks from those measured, and the effective weights of
+    the measured ones"""
+
+    import numpy as np
+
+    measured = processes > 0
+    if not measured.any():
+        return weights @ covariance @ weights, None, None
+    gain = np.linalg.solve(
+        covariance[np.ix_(measured, measured)], covariance[np.ix_(measured, ~measured)]
+    )
+    effective_weights = weights[measured] + gain @ weights[~measured]
+    residual = (
+        covariance[np.ix_(~measured, ~measured)]
+        - covariance[np.ix_(~measured, measured)] @ gain
+    )
+    variance = weights[~measured] @ residual @ weights[~measured] + np.sum(
+        effective_weights**2 * sample_variances[measured] / processes[measured]
+    )
+    return variance, gain, effective_weights
+
+
+def select_time_budget_runs(covariance, weights, sample_variances, costs, budget):
+    """Greedily raises the process count of the benchmark whose raise most
+    reduces the variance of the predicted score per second it takes, until the
+    budget is spent. Raises by several processes are considered too, as one
+    noisy process may predict worse than the history alone. Returns the
+    process count of every benchmark"""
+
+    import numpy as np
+
+    processes = np.zeros(len(weights), dtype=int)
+    variance = get_prediction_variance(
+        covariance, weights, sample_variances, processes
+    )[0]
+    spent = 0
+    while True:
+        best = None
+        for index, cost in enumerate(costs):
+            current = processes[index]
+            for process_num in range(current + 1, TIME_BUDGET_MAX_PROCESSES + 1):
+                added_cost = (process_num - current) * cost
+                if spent + added_cost > budget:
+                    break
+                processes[index] = process_num
+                reduction = (
+                    variance
+                    - get_prediction_variance(
+                        covariance, weights, sample_variances, processes
+                    )[0]
+                ) / added_cost
+                if reduction > 0 and (best is None or reduction > best[0]):
+                    best = (reduction, index, process_num, added_cost)
+            processes[index] = current
+        if best is None:
+            return processes
+        _, index, process_num, added_cost = best
+        processes[index] = process_num
+        spent += added_cost
+        variance = get_prediction_variance(
+            covariance, weights, sample_variances, processes
+        )[0]
+
+
+def run_time_budget(budget):
+    """Time-budgeted WasmScore: runs the subset of WasmScore benchmarks, each
+    with the number of processes, that best predicts the Wasm Execution Score
+    within the budget, based on this host's history of the benchmarks' run
+    times and of how their times move together. The rest of the benchmarks are
+    predicted from the measured ones, and the score is reported with the
+    standard deviation of its prediction"""
+
+    import numpy as np
+    import pandas as pd
+    from termcolor import colored
+
+    logging.info("Running time-budgeted WasmScore ...")
+    engine = list(WASM_ENGINES)[0]
+    weights = get_wasmscore_weights()
+    benchmarks = list(weights)
+    log_times, process_seconds, sample_cvs = load_time_budget_history(
+        benchmarks, engine
+    )
+    run_counts = log_times.count()
+    missing = [
+        benchmark
+        for benchmark in benchmarks
+        if run_counts[benchmark] < TIME_BUDGET_MIN_RUNS
+    ]
+    if missing:
+        print(
+            f"--time-budget needs {TIME_BUDGET_MIN_RUNS} recorded runs of every "
+            f"WasmScore benchmark on this host, missing: {', '.join(missing)}"
+        )
+        print("Running QuickRun-WasmScore instead")
+        run_quickrun_wasmscore()
+        return
+
+    weights = np.array([weights[benchmark] for benchmark in benchmarks])
+    costs = process_seconds.to_numpy()
+    sample_variances = (sample_cvs**2).to_numpy() / TIME_BUDGET_ITERATIONS_PER_PROCESS
+    covariance = get_log_time_covariance(log_times)
+    processes = select_time_budget_runs(
+        covariance, weights, sample_variances, costs, budget
+    )
+
+    plan_df = pd.DataFrame(
+        {
+            "benchmark": benchmarks,
+            "weight": weights,
+            "processes": processes,
+            "est_seconds": processes * costs,
+        }
+    )
+    print_verbose("")
+    print_verbose(
+        colored(
+            f"Time budget {budget:g}s: measuring {np.count_nonzero(processes)} of "
+            f"{len(benchmarks)} benchmarks, estimated {np.sum(processes * costs):.1f}s "
+            f"(full WasmScore {np.sum(costs) * DEFAULT_BENCH_PROCESS_NUM:.1f}s)",
+            "green",
+            attrs=["bold"],
+        )
+    )
+    print_verbose(plan_df.to_string(index=False))
+    if not processes.any():
+        print(
+            "The time budget is too short to improve on the history, predicting from it alone"
+        )
+
+    start_time = time.monotonic()
+    BENCH_PROCESS_NUMS.update(
+        {
+            benchmark: int(process_num)
+            for benchmark, process_num in zip(benchmarks, processes)
+            if process_num
+        }
+    )
+    benchmark_dfs = run_benchmark_list(
+        [(benchmark, False) for benchmark in BENCH_PROCESS_NUMS]
+    )
+    measured_log_times = pd.Series(float("NaN"), index=benchmarks)
+    for benchmark, benchmark_df in zip(BENCH_PROCESS_NUMS, benchmark_dfs):
+        if benchmark_df is None:
+            # Failed benchmarks are predicted like the unmeasured ones
+            processes[benchmarks.index(benchmark)] = 0
+            continue
+        measured_log_times[benchmark] = np.log(
+            benchmark_df.loc[
+                (benchmark_df["engine"] == engine)
+                & (benchmark_df["phase"] == "Execution"),
+                "mean",
+            ].iloc[0]
+        )
+
+    variance, _, effective_weights = get_prediction_variance(
+        covariance, weights, sample_variances, processes
+    )
+    mean_log_times = log_times.mean().to_numpy()
+    predicted_log_time = weights @ mean_log_times
+    if effective_weights is not None:
+        measured = processes > 0
+        predicted_log_time += effective_weights @ (
+            measured_log_times.to_numpy()[measured] - mean_log_times[measured]
+        )
+    score = WASMSCORE_CONSTANT / np.exp(predicted_log_time)
+    print_verbose("")
+    print(
+        colored(
+            f"Predicted Wasm Execution Score (Higher Better): {score:.2f} "
+            f"+/- {score * (np.exp(np.sqrt(variance)) - 1):.2f} "
+            f"(1 sd, {time.monotonic() - start_time:.1f}s)",
+            "green",
+            attrs=["bold"],
+        )
+    )
+    print("")
+
+
+def run_coldstart_module(benchmark, engine, variant):
+    """Starts a module --coldstart-iterations times on one engine and returns the
+    raw Compilation, Instantiation and Execution times (ns) of every start, plus
+    the sum of Compilation and Instantiation as Startup"""
+
+    import pandas as pd
+
+    engine_path, benchmark_path, results_name, engine_flags = get_engine_run(
+        benchmark, engine
+    )
+    if variant == "precompiled":
+        engine_flags = " ".join(
+            flags for flags in [engine_flags, COLDSTART_PRECOMPILED_FLAGS] if flags
+        )
+    processes = max(
+        ARGS_DICT["coldstart_iterations"] // COLDSTART_ITERATIONS_PER_PROCESS, 1
+    )
+    output_path = f"{SG_BENCHMARKS_BASE}/results/{benchmark}_{results_name}_coldstart_{variant}.csv"
+    cli_cmd_string = get_sightglass_command(
+        engine_path,
+        benchmark_path,
+        f"--processes={processes} "
+        f"--iterations-per-process={COLDSTART_ITERATIONS_PER_PROCESS}",
+        output_path,
+        engine_flags=engine_flags,
+    )
+    if variant == "precompiled":
+        # Warm the compilation cache so every measured start loads a compiled module
+        cli_cmd_string = (
+            get_sightglass_command(
+                engine_path,
+                benchmark_path,
+                "--processes=1 --iterations-per-process=1",
+                f"{output_path}.warmup",
+                engine_flags=engine_flags,
+            )
+            + f" && rm {output_path}.warmup && {cli_cmd_string}"
+        )
+    run_or_fail(
+        f"{engine} {variant} cold start",
+        cli_cmd_string,
+        os.path.dirname(benchmark_path),
+    )
+
+    raw_df = pd.read_csv(output_path)
+    raw_df = raw_df[raw_df["event"] == "nanoseconds"].pivot_table(
+        index=["process", "iteration"], columns="phase", values="count"
+    )
+    raw_df["Startup"] = raw_df[["Compilation", "Instantiation"]].sum(axis=1)
+    return raw_df
+
+
+def run_coldstart():
+    """ColdStart test: starts noop and other small modules thousands of times,
+    with and without a precompiled module, and reports the tail latencies of
+    each phase. The startup score is based on the p99 of the startup time
+    (compile and instantiate), which matters more than the mean for FaaS-style
+    workloads"""
+
+    import numpy as np
+    import pandas as pd
+    from termcolor import colored
+
+    logging.info("Running ColdStart test ...")
+    print_verbose("")
+    print_verbose(
+        colored(f"Cold starting {COLDSTART_BENCHMARKS}", "green", attrs=["bold"])
+    )
+
+    rows = []
+    for benchmark in COLDSTART_BENCHMARKS:
+        benchmark_rows = []
+        try:
+            for variant in ["compiled", "precompiled"]:
+                for engine in get_engine_order(benchmark, list(WASM_ENGINES)):
+                    print_verbose(f"Cold starting {engine} ({benchmark}, {variant}).")
+                    startup_df = run_coldstart_module(benchmark, engine, variant)
+                    for phase in [
+                        "Compilation",
+                        "Instantiation",
+                        "Execution",
+                        "Startup",
+                    ]:
+                        benchmark_rows.append(
+                            [benchmark, engine, variant, phase, len(startup_df)]
+                            + list(
+                                np.percentile(startup_df[phase], COLDSTART_PERCENTILES)
+                            )
+                        )
+        except BenchmarkFailure as failure:
+            # Exclude the module from every engine and variant so the startup
+            # scores stay comparable
+            FAILED_BENCHMARKS[benchmark] = str(failure)
+            print(f"Excluding {benchmark}: {failure}")
+            continue
+        rows.extend(benchmark_rows)
+
+    coldstart_df = pd.DataFrame(
+        rows,
+        columns=["benchmark", "engine", "variant", "phase", "samples"]
+        + [f"p{percentile:g}" for percentile in COLDSTART_PERCENTILES],
+    )
+    coldstart_df.to_csv(f"{SG_BENCHMARKS_BASE}/results/coldstart.csv", index=False)
+    COLDSTART_DF.append(coldstart_df)
+
+    print("")
+    print(coldstart_df.to_string(index=False, float_format="{:.0f}".format))
+    print("")
+    for (engine, variant), startup_df in coldstart_df[
+        coldstart_df["phase"] == "Startup"
+    ].groupby(["engine", "variant"], sort=False):
+        score_name = (
+            "Wasm Startup Score"
+            if variant == "compiled"
+            else "Wasm Precompiled Startup Score"
+        )
+        if len(WASM_ENGINES) > 1:
+            score_name += f" [{engine}]"
+        print_score(
+            score_name, 1 / geo_mean_overflow(startup_df["p99"]) * WASMSCORE_CONSTANT
+        )
+    print("")
+
+
+def get_benchmark_name(benchmark_path):
+    """Benchmark name of a wasm or native artifact path found in raw results.
+    Native benchmarks run from NATIVE_RUN_DIR/<benchmark>/, named by their
+    directory"""
+    run_dir = os.path.dirname(benchmark_path)
+    if (
+        os.path.dirname(run_dir) == NATIVE_RUN_DIR
+        and os.path.basename(run_dir) in sg_benchmarks_native
+    ):
+        return os.path.basename(run_dir)
+    for benchmarks in [sg_benchmarks_wasm, sg_benchmarks_native]:
+        for benchmark, path in benchmarks.items():
+            if benchmark_path.endswith(path):
+                return benchmark
+    return os.path.basename(benchmark_path)
+
+
+def get_engine_label(engine_path, results_path):
+    """Engine label of a libengine.so path found in a raw results file. Results
+    files named by a run ({benchmark}_native_results.csv or
+    {benchmark}_wasm_{label}_results.csv) carry the label in their name, and
+    those of a single-engine run ({benchmark}_wasm_results.csv) get the label
+    of the single registered engine. Otherwise the path must be the native
+    engine or a registered engine"""
+    results_file = os.path.basename(results_path)
+    if results_file.endswith("_native_results.csv"):
+        return "Native"
+    labelled = re.search(r"_wasm_(.+)_results\.csv$", results_file)
+    if labelled:
+        for engine in WASM_ENGINES:
+            if re.sub(r"[^A-Za-z0-9_.-]", "_", engine) == labelled.group(1):
+                return engine
+        return labelled.group(1)
+    if engine_path == NATIVE_ENGINE_PATH or "/native/" in engine_path:
+        return "Native"
+    for engine, engine_config in WASM_ENGINES.items():
+        if engine_config["path"] == engine_path:
+            return engine
+    if results_file.endswith("_wasm_results.csv") and len(WASM_ENGINES) == 1:
+        return list(WASM_ENGINES)[0]
+    print(
+        f"Unknown engine {engine_path} in {results_path}, "
+        "register it with --engines LABEL=PATH"
+    )
+    sys.exit(1)
+
+
+def get_engine_path(engine):
+    """libengine.so path of an engine label"""
+    if engine == "Native":
+        return NATIVE_ENGINE_PATH
+    return WASM_ENGINES.get(engine, {}).get("path", "")
+
+
+def load_engine_registry():
+    """Registers the Wasm engines given by --engines-config and --engines. The
+    config file is YAML mapping each engine label to its libengine.so path, or
+    to a mapping with a 'path' key and optional bench-api engine 'flags'. With
+    --sweep, every engine is expanded to one entry per setting combination"""
+
+    engines = {}
+    if ARGS_DICT["engines_config"]:
+        import yaml
+
+        with open(ARGS_DICT["engines_config"], encoding="utf-8") as config:
+            for engine, engine_config in (yaml.safe_load(config) or {}).items():
+                if isinstance(engine_config, str):
+                    engine_config = {"path": engine_config}
+                engines[str(engine)] = dict(engine_config)
+    for engine_arg in ARGS_DICT["engines"] or []:
+        engine, _, engine_path = engine_arg.partition("=")
+        if not engine_path:
+            print(f"Engine {engine_arg} is not valid, expected LABEL=PATH")
+            sys.exit(1)
+        engines[engine] = {"path": engine_path}
+
+    for engine, engine_config in engines.items():
+        if engine == "Native":
+            print("Engine label Native is reserved for native runs")
+            sys.exit(1)
+        if not os.path.isfile(engine_config.get("path", "")):
+            print(f"Engine {engine} not found at {engine_config.get('path')}")
+            sys.exit(1)
+
+    global WASM_ENGINES
+    if engines:
+        WASM_ENGINES = engines
+    if ARGS_DICT["sweep"]:
+        WASM_ENGINES = get_sweep_engines(ARGS_DICT["sweep"], WASM_ENGINES)
+    logging.info("Registered engines ... %s", WASM_ENGINES)
+
+
+def get_sweep_engines(sweep_path, engines):
+    """Expands each engine into one entry per combination of the settings matrix
+    in sweep_path. The matrix is YAML mapping each setting to its values, either a
+    list of engine flags or a mapping of value labels to engine flags, e.g.
+
+        opt-level: {none: "-O opt-level=0", speed: "-O opt-level=2"}
+        pooling: {"off": "", "on": "-O pooling-allocator"}
+
+    YAML 1.1 reads unquoted on/off and yes/no as booleans; such labels are
+    turned back into on and off"""
+
+    import yaml
+
+    with open(sweep_path, encoding="utf-8") as sweep_file:
+        matrix = yaml.safe_load(sweep_file) or {}
+
+    def sweep_label(label):
+        if isinstance(label, bool):
+            return "on" if label else "off"
+        return str(label)
+
+    settings = []
+    for setting, values in matrix.items():
+        if isinstance(values, dict):
+            values = [
+                (sweep_label(label), str(flags or ""))
+                for label, flags in values.items()
+            ]
+        elif isinstance(values, list):
+            values = [(str(flags), str(flags)) for flags in values]
+        else:
+            print(f"Sweep setting {setting} is not valid, expected a list or mapping")
+            sys.exit(1)
+        settings.append(
+            [(f"{sweep_label(setting)}={label}", flags) for label, flags in values]
+        )
+
+    sweep_engines = {}
+    for engine, engine_config in engines.items():
+        for combination in itertools.product(*settings):
+            label = ",".join(setting_label for setting_label, _ in combination)
+            if len(engines) > 1:
+                label = f"{engine}:{label}"
+            flags = [engine_config.get("flags", "")] + [
+                flags for _, flags in combination
+            ]
+            sweep_engines[label] = dict(
+                engine_config, flags=" ".join(flag for flag in flags if flag)
+            )
+    return sweep_engines
+
+
+def run_sweep():
+    """Engine configuration sweep. Runs the suites given with --suites, or the
+    WasmScore suites, once per setting combination and prints the combinations
+    ranked by their execution score"""
+
+    import pandas as pd
+    from termcolor import colored
+
+    logging.info("Running engine configuration sweep ... ")
+
+    sweep_summary_df = None
+    for suite in ARGS_DICT["suites"] or WASMSCORE_SUITES:
+        if suite not in perf_suites:
+            print(f"Suite {suite} is not valid")
+            continue
+        suite_summary_df = run_suites(suite, ARGS_DICT["native"])
+        if isinstance(suite_summary_df, pd.DataFrame):
+            sweep_summary_df = pd.concat([sweep_summary_df, suite_summary_df])
+
+    if not isinstance(sweep_summary_df, pd.DataFrame):
+        return
+
+    sweep_summary_df["score"] = 1 / sweep_summary_df["time"] * WASMSCORE_CONSTANT
+    ranking_df = sweep_summary_df.pivot(index="engine", columns="suite", values="score")
+    ranking_df.insert(
+        0,
+        "score",
+        1
+        / sweep_summary_df.groupby("engine")["time"].agg(geo_mean_overflow)
+        * WASMSCORE_CONSTANT,
+    )
+    ranking_df["flags"] = [
+        WASM_ENGINES[engine].get("flags", "") for engine in ranking_df.index
+    ]
+    ranking_df = ranking_df.sort_values("score", ascending=False).reset_index()
+    ranking_df.insert(0, "rank", range(1, len(ranking_df) + 1))
+
+    print("")
+    print(
+        colored(
+            ranking_df.to_string(index=False, float_format="{:.2f}".format),
+            "green",
+            attrs=["bold"],
+        )
+    )
+    print("")
+
+
+def read_comparison_input(path):
+    """Reads one side of --compare: a --dumpfile CSV, a raw sightglass CSV, or a
+    folder of raw sightglass CSVs. Returns the benchmark, engine, phase and value
+    rows (one per raw sample, or one per summarized mean) and the suites found"""
+
+    import pandas as pd
+
+    if os.path.isdir(path):
+        paths = sorted(glob.glob(os.path.join(path, "*_results.csv")))
+    else:
+        paths = [path]
+    if not paths:
+        print(f"No results found in {path}")
+        sys.exit(1)
+    input_dfs = []
+    for csv_path in paths:
+        csv_df = pd.read_csv(csv_path)
+        if "count" in csv_df:
+            csv_df["engine"] = csv_df["engine"].map(
+                {
+                    engine_path: get_engine_label(engine_path, csv_path)
+                    for engine_path in csv_df["engine"].unique()
+                }
+            )
+        input_dfs.append(csv_df)
+    input_df = pd.concat(input_dfs)
+
+    if "count" in input_df:
+        input_df = input_df[input_df["event"] == ARGS_DICT["metric"]]
+        input_df = pd.DataFrame(
+            {
+                "benchmark": input_df["wasm"].map(get_benchmark_name),
+                "engine": input_df["engine"],
+                "phase": input_df["phase"],
+                "value": input_df["count"].astype("float64"),
+            }
+        )
+        suites = {
+            suite: benchmarks
+            for suite, benchmarks in perf_suites.items()
+            if set(benchmarks) & set(input_df["benchmark"])
+        }
+        return input_df, suites, True
+
+    if "suite" in input_df:
+        suites = input_df.groupby("suite", sort=False)["benchmark"].unique()
+        suites = {suite: list(benchmarks) for suite, benchmarks in suites.items()}
+        input_df = input_df.drop_duplicates(COMPARE_KEY_COLUMNS)
+    else:
+        suites = {}
+    input_df = input_df.rename(columns={"mean": "value"})
+    return input_df, suites, False
+
+
+def bootstrap_means(input_df, is_raw, rng):
+    """Point estimates and bootstrap replicates of the mean of every benchmark,
+    engine and phase. Raw samples are resampled with replacement, all groups at
+    once; summarized inputs are drawn from a normal distribution when they carry
+    a stddev and sample count, and are constant otherwise"""
+
+    import numpy as np
+
+    input_df = input_df.sort_values(COMPARE_KEY_COLUMNS, kind="stable")
+    grouped = input_df.groupby(COMPARE_KEY_COLUMNS, sort=False)
+    means_df = grouped["value"].agg(["mean", "count"]).reset_index()
+    means = means_df["mean"].to_numpy()
+
+    if not is_raw:
+        if "stddev" in input_df and "samples" in input_df:
+            std_errors = (input_df["stddev"] / np.sqrt(input_df["samples"])).to_numpy()
+            replicates = means[:, None] + std_errors[:, None] * rng.standard_normal(
+                (len(means), COMPARE_BOOTSTRAP_NUM)
+            )
+            means_df["has_ci"] = True
+        else:
+            replicates = np.repeat(means[:, None], COMPARE_BOOTSTRAP_NUM, axis=1)
+            means_df["has_ci"] = False
+        return means_df, replicates
+
+    values = input_df["value"].to_numpy()
+    sizes = means_df["count"].to_numpy()
+    offsets = np.cumsum(sizes) - sizes
+    sample_sizes = np.repeat(sizes, sizes)
+    sample_offsets = np.repeat(offsets, sizes)
+
+    replicates = np.empty((len(means), COMPARE_BOOTSTRAP_NUM))
+    chunk = max(1, COMPARE_BOOTSTRAP_CHUNK // len(values))
+    for start in range(0, COMPARE_BOOTSTRAP_NUM, chunk):
+        stop = min(start + chunk, COMPARE_BOOTSTRAP_NUM)
+        draws = rng.random((stop - start, len(values)))
+        indices = sample_offsets + (draws * sample_sizes).astype(np.int64)
+        sums = np.add.reduceat(values[indices], offsets, axis=1)
+        replicates[:, start:stop] = (sums / sizes).T
+    means_df["has_ci"] = sizes > 1
+    return means_df, replicates
+
+
+def summarize_log_speedups(log_speedups):
+    """Speedup, 95% bootstrap interval and two-sided bootstrap p-value from
+    replicates of log(baseline / candidate), one row per comparison"""
+
+    import numpy as np
+
+    ci_low, ci_high = np.exp(np.percentile(log_speedups, [2.5, 97.5], axis=-1))
+    p_value = 2 * np.minimum(
+        (log_speedups <= 0).mean(axis=-1), (log_speedups >= 0).mean(axis=-1)
+    )
+    return ci_low, ci_high, np.minimum(p_value, 1.0)
+
+
+def compare_results(baseline_path, candidate_path):
+    """Compares two result sets: per benchmark and phase speedups with bootstrap
+    confidence intervals and significance, suite level speedups, and the
+    overall WasmScore delta"""
+
+    import numpy as np
+    import pandas as pd
+
+    logging.info("Comparing %s against %s ...", candidate_path, baseline_path)
+    rng = np.random.default_rng()
+
+    baseline_df, baseline_suites, baseline_raw = read_comparison_input(baseline_path)
+    candidate_df, candidate_suites, candidate_raw = read_comparison_input(
+        candidate_path
+    )
+    baseline_means, baseline_replicates = bootstrap_means(
+        baseline_df, baseline_raw, rng
+    )
+    candidate_means, candidate_replicates = bootstrap_means(
+        candidate_df, candidate_raw, rng
+    )
+
+    baseline_means["baseline_index"] = np.arange(len(baseline_means))
+    candidate_means["candidate_index"] = np.arange(len(candidate_means))
+    compare_df = baseline_means.merge(
+        candidate_means, on=COMPARE_KEY_COLUMNS, suffixes=("_baseline", "_candidate")
+    )
+    if compare_df.empty:
+        print("No benchmarks in common between the two result sets")
+        return
+
+    log_speedups = np.log(
+        np.clip(baseline_replicates[compare_df["baseline_index"]], 1e-12, None)
+    ) - np.log(
+        np.clip(candidate_replicates[compare_df["candidate_index"]], 1e-12, None)
+    )
+    has_ci = (compare_df["has_ci_baseline"] & compare_df["has_ci_candidate"]).to_numpy()
+
+    compare_df["speedup"] = compare_df["mean_baseline"] / compare_df["mean_candidate"]
+    ci_low, ci_high, p_value = summarize_log_speedups(log_speedups)
+    compare_df["ci_low"] = np.where(has_ci, ci_low, np.nan)
+    compare_df["ci_high"] = np.where(has_ci, ci_high, np.nan)
+    compare_df["p_value"] = np.where(has_ci, p_value, np.nan)
+    compare_df["significant"] = compare_df["p_value"] < COMPARE_SIGNIFICANCE
+    compare_df = compare_df.rename(
+        columns={"mean_baseline": "baseline", "mean_candidate": "candidate"}
+    )[
+        COMPARE_KEY_COLUMNS
+        + [
+            "baseline",
+            "candidate",
+            "speedup",
+            "ci_low",
+            "ci_high",
+            "p_value",
+            "significant",
+        ]
+    ]
+
+    print_verbose("")
+    print(compare_df.to_string(index=False))
+    print_verbose("")
+
+    suites = dict(baseline_suites)
+    for suite, benchmarks in candidate_suites.items():
+        suites[suite] = list(
+            dict.fromkeys(list(suites.get(suite, [])) + list(benchmarks))
+        )
+
+    suite_rows = []
+    suite_log_speedups = {}
+    for suite, benchmarks in suites.items():
+        for (engine, phase), group_df in compare_df[
+            compare_df["benchmark"].isin(benchmarks)
+        ].groupby(["engine", "phase"], sort=False):
+            suite_replicates = log_speedups[group_df.index].mean(axis=0)
+            suite_ci_low, suite_ci_high, suite_p_value = summarize_log_speedups(
+                suite_replicates
+            )
+            suite_has_ci = has_ci[group_df.index].all()
+            suite_rows.append(
+                [
+                    suite,
+                    engine,
+                    phase,
+                    len(group_df),
+                    geo_mean_overflow(group_df["speedup"]),
+                    suite_ci_low if suite_has_ci else np.nan,
+                    suite_ci_high if suite_has_ci else np.nan,
+                    suite_p_value if suite_has_ci else np.nan,
+                ]
+            )
+            if engine != "Native" and phase == "Execution":
+                suite_log_speedups.setdefault(engine, {})[suite] = (
+                    suite_replicates,
+                    suite_has_ci,
+                )
+
+    if suite_rows:
+        suite_compare_df = pd.DataFrame(
+            suite_rows,
+            columns=[
+                "suite",
+                "engine",
+                "phase",
+                "benchmarks",
+                "speedup",
+                "ci_low",
+                "ci_high",
+                "p_value",
+            ],
+        )
+        print(suite_compare_df.to_string(index=False))
+        print_verbose("")
+
+    for engine, engine_log_speedups in suite_log_speedups.items():
+        print_compare_score(compare_df, suites, engine, engine_log_speedups)
+
+    if ARGS_DICT["dumpfile"]:
+        compare_df.to_csv(ARGS_DICT["dumpfile"], sep=",", index=False)
+
+
+def print_compare_score(compare_df, suites, engine, engine_log_speedups):
+    """Print the WasmScore delta of one Wasm engine with its bootstrap interval"""
+
+    import numpy as np
+    from termcolor import colored
+
+    score_suites = [suite for suite in WASMSCORE_SUITES if suite in engine_log_speedups]
+    if not score_suites:
+        score_suites = list(engine_log_speedups)
+    score_replicates = np.mean(
+        [engine_log_speedups[suite][0] for suite in score_suites], axis=0
+    )
+    score_delta = geo_mean_overflow(
+        [
+            geo_mean_overflow(
+                compare_df.loc[
+                    compare_df["benchmark"].isin(suites[suite])
+                    & (compare_df["engine"] == engine)
+                    & (compare_df["phase"] == "Execution"),
+                    "speedup",
+                ]
+            )
+            for suite in score_suites
+        ]
+    )
+    score_ci_low, score_ci_high, score_p_value = summarize_log_speedups(
+        score_replicates
+    )
+    engine_note = "" if engine == "Wasmtime" else f" [{engine}]"
+    score_line = "WasmScore Delta ({}){}: {:+.2f}%".format(
+        ", ".join(score_suites), engine_note, (score_delta - 1) * 100
+    )
+    if all(engine_log_speedups[suite][1] for suite in score_suites):
+        score_line += " [{:+.2f}%, {:+.2f}%] (p={:.3f})".format(
+            (score_ci_low - 1) * 100, (score_ci_high - 1) * 100, score_p_value
         )
-        sys.exit(error.returncode)
+    print(colored(score_line, "green", attrs=["bold"]))
+    print("")
 
-    cli_summarize_string = (
-        f"/sightglass/target/release/sightglass-cli summarize --input-format csv "
-        f"--output-format csv -f {results_path} > {results_summarized_path}"
-    )
 
-    try:
-        logging.info(
-            "Trying sightglass-cli summarize command for wasm ... %s",
-            cli_summarize_string,
-        )
-        output = subprocess.check_output(
-            cli_summarize_string,
-            shell=True,
-            text=True,
-            cwd=f"{wasm_benchmark_dir}",
-            stderr=subprocess.STDOUT,
-        )
-        logging.debug("%s", output)
-    except subprocess.CalledProcessError as error:
-        print(
-            f"Running sightglass-cli summarize failed with error code {error.returncode}"
+def to_json_records(results_df):
+    """Result rows as JSON-serializable records, with NaN as None"""
+    return json.loads(
+        json.dumps(
+            [
+                {
+                    column: (
+                        None if isinstance(value, float) and value != value else value
+                    )
+                    for column, value in record.items()
+                }
+                for record in results_df.to_dict("records")
+            ],
+            default=lambda value: (
+                value.item() if hasattr(value, "item") else str(value)
+            ),
         )
-        sys.exit(error.returncode)
-
-    os.system(
-        f'grep -v "cycles"  {results_summarized_path} > results/tmpfile && '
-        f"mv results/tmpfile {results_summarized_path}"
     )
-    pd.read_csv(results_summarized_path, usecols=["phase", "mean"], header=0).to_csv(
-        results_summarized_transposed_path, header=True, index=False
+
+
+def stream_results(results_df):
+    """Writes result rows to --stream as JSON lines as soon as they are available"""
+    if not ARGS_DICT["stream"]:
+        return
+    lines = "".join(
+        json.dumps({"run_id": RUN_ID, **record}) + "\n"
+        for record in to_json_records(results_df)
     )
+    with STREAM_LOCK:
+        if ARGS_DICT["stream"] == "-":
+            STREAM_STDOUT.write(lines)
+            STREAM_STDOUT.flush()
+        else:
+            with open(ARGS_DICT["stream"], "a", encoding="utf-8") as stream:
+                stream.write(lines)
 
-    wasm_df = pd.read_csv(
-        results_summarized_path, usecols=["wasm", "arch", "engine", "phase", "mean"]
-    )[["wasm", "arch", "engine", "phase", "mean"]]
 
-    wasm_df = wasm_df.rename(columns={"wasm": "benchmark"})
-    wasm_df.loc[:, ["engine"]] = "Wasmtime"
-    wasm_df.loc[:, ["benchmark"]] = f"{benchmark}"
+def reserve_stdout_for_stream():
+    """With --stream -, keeps stdout for the JSON lines alone: the stream gets
+    its own copy of stdout, and everything else printed, by this script or by
+    the commands it runs, goes to stderr"""
+    global STREAM_STDOUT
+    sys.stdout.flush()
+    STREAM_STDOUT = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
 
-    benchmark_df = wasm_df.copy()
 
-    if isinstance(native_df, pd.DataFrame):
-        logging.info("Getting efficiency ... ")
-        native_mean = native_df[native_df["phase"].str.match("Execution")].iloc[0][
-            "mean"
-        ]
-        wasm_mean = wasm_df[wasm_df["phase"].str.match("Execution")].iloc[0]["mean"]
-        benchmark_df["efficiency"] = float("NaN")
-        benchmark_df = pd.concat([native_df, benchmark_df])
-        benchmark_df.loc[
-            (benchmark_df["phase"] == "Execution")
-            & (benchmark_df["engine"] == "Wasmtime"),
-            "efficiency",
-        ] = (
-            native_mean / wasm_mean
-        )
-        benchmark_df.loc[
-            (benchmark_df["phase"] == "Execution")
-            & (benchmark_df["engine"] == "Native"),
-            "efficiency",
-        ] = (
-            wasm_mean / native_mean
-        )
+def get_journal_header():
+    """Settings a run's results depend on, recorded at the top of its journal"""
+    return {
+        "settings": {
+            setting: ARGS_DICT[setting]
+            for setting in WORKER_SETTINGS
+            if setting not in ("force", "timeout", "retries")
+        },
+        "engines": WASM_ENGINES,
+        "processes": DEFAULT_BENCH_PROCESS_NUM,
+    }
 
-    os.system(f"sed -i 1d {results_summarized_transposed_path}")
-    if not ARGS_DICT["quiet"]:
-        os.system(
-            f'termgraph {results_summarized_transposed_path} --title "{termgraph_title}" --color blue'
-        )
-    else:
-        if isinstance(wasm_df, pd.DataFrame):
-            print(wasm_df.to_csv(index=False, header=None, sep=","))
 
-    if isinstance(benchmark_df, pd.DataFrame):
-        global BENCHMARK_DF
-        BENCHMARK_DF = pd.concat([BENCHMARK_DF, benchmark_df])
-    return benchmark_df
+def load_journal(run_id):
+    """Loads the results journaled by an earlier run, to be resumed"""
+    journal_path = os.path.join(JOURNAL_DIR, f"{run_id}.jsonl")
+    if not os.path.isfile(journal_path):
+        print(f"No journal found for run {run_id}")
+        sys.exit(1)
+    with open(journal_path, encoding="utf-8") as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash
+                continue
+            if "header" in entry:
+                JOURNAL["header"] = entry["header"]
+            else:
+                JOURNAL["results"][(entry["benchmark"], entry["native"])] = entry[
+                    "records"
+                ]
+    print_verbose(f"Resuming run {run_id}: {len(JOURNAL['results'])} benchmarks done.")
 
 
-def geo_mean_overflow(iterable):
-    """Helper function to avoid overflow errors during geo-mean calculation"""
-    calc = np.log(iterable)
-    return np.exp(calc.mean())
+def check_journal_header():
+    """Writes the journal header on first use. A resumed run must use the same
+    settings as the journaled results it is merged with"""
+    with JOURNAL_LOCK:
+        if JOURNAL["checked"]:
+            return
+        JOURNAL["checked"] = True
+        header = json.loads(json.dumps(get_journal_header()))
+        if JOURNAL["header"] is None:
+            write_journal_entry({"header": header})
+        elif JOURNAL["header"] != header:
+            print(f"Run {RUN_ID} was measured with different settings, cannot resume")
+            print(f"Journaled: {JOURNAL['header']}")
+            sys.exit(1)
 
 
-def run_suites(suite_name, run_native=False):
-    """Benchmark a suite"""
+def write_journal_entry(entry):
+    """Appends an entry to this run's journal, synced to disk. Call with
+    JOURNAL_LOCK held"""
+    os.makedirs(JOURNAL_DIR, exist_ok=True)
+    with open(
+        os.path.join(JOURNAL_DIR, f"{RUN_ID}.jsonl"), "a", encoding="utf-8"
+    ) as journal:
+        journal.write(json.dumps(entry) + "\n")
+        journal.flush()
+        os.fsync(journal.fileno())
 
-    logging.info("Running suite ...")
-    print_verbose("")
-    print_verbose(
-        colored(
-            f"Benchmarking {suite_name}: {perf_suites[suite_name]}",
-            "green",
-            attrs=["bold"],
+
+def remove_journal():
+    """Removes this run's journal once the run has completed, so only
+    interrupted or failed runs are left to resume"""
+    journal_path = os.path.join(JOURNAL_DIR, f"{RUN_ID}.jsonl")
+    if os.path.isfile(journal_path):
+        os.remove(journal_path)
+        logging.info("Removed completed run journal ... %s", journal_path)
+
+
+def journal_results(benchmark, run_native, benchmark_df):
+    """Records a finished benchmark's results in the run journal"""
+    with JOURNAL_LOCK:
+        write_journal_entry(
+            {
+                "benchmark": benchmark,
+                "native": bool(run_native),
+                "records": to_json_records(benchmark_df),
+            }
         )
-    )
 
-    suite_df = None
-    suite_wasm_efficiency_avg = None
-    suite_wasm_time_mean = None
 
-    for benchmark in perf_suites[suite_name]:
-        if ARGS_DICT["native"] or run_native:
-            benchmark_df = run_benchmarks(benchmark, True)
-        else:
-            benchmark_df = run_benchmarks(benchmark)
+def get_journaled_results(benchmark, run_native):
+    """Results of a benchmark already journaled by the resumed run, if any"""
 
-        suite_df = pd.concat([suite_df, benchmark_df])
+    import pandas as pd
 
-    if not isinstance(suite_df, pd.DataFrame):
-        return [None, None]
+    check_journal_header()
+    records = JOURNAL["results"].get((benchmark, bool(run_native)))
+    if records is None:
+        return None
+    return pd.DataFrame(records)
 
-    suite_wasm_time_slice_df = pd.DataFrame(
-        suite_df.loc[
-            (suite_df["phase"] == "Execution") & (suite_df["engine"] == "Wasmtime"),
-            "mean",
-        ]
-    )
 
-    suite_wasm_time_mean = geo_mean_overflow(suite_wasm_time_slice_df.loc[:, "mean"])
-    suite_summary_df = pd.DataFrame(
-        [[f"{suite_name}", suite_wasm_time_mean]], columns=["suite", "time"]
-    )
-    suite_df.insert(0, "suite", f"{suite_name}")
+def send_message(stream, message):
+    """Writes one JSON-lines message of the coordinator/worker protocol"""
+    stream.write((json.dumps(message) + "\n").encode())
+    stream.flush()
 
-    if "efficiency" in suite_df:
-        suite_wasm_efficiency_avg = suite_df.loc[
-            (suite_df["engine"] == "Wasmtime") & (suite_df["phase"] == "Execution"),
-            "efficiency",
-        ].mean()
-        suite_summary_df["efficiency"] = [suite_wasm_efficiency_avg]
 
-    if isinstance(benchmark_df, pd.DataFrame):
-        global SUITE_DF
-        SUITE_DF = pd.concat([SUITE_DF, suite_df])
-    return suite_summary_df
+def receive_message(stream):
+    """Reads one JSON-lines message of the coordinator/worker protocol"""
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("connection closed")
+    return json.loads(line)
 
 
-def run_wasmscore():
-    """WasmScore test. Runs a collection of suites, both Wasm and native benchmarks
-    by default, and reports out a Wasm performance score based a geo-mean of the
-    performances of the benchmark suites. The test also reports a Wasm efficiency based
-    on Wasm's performance relative to native."""
+def parse_address(address, default_host="localhost"):
+    """(host, port) of a [HOST:]PORT command line address"""
+    host, _, port = address.rpartition(":")
+    return host or default_host, int(port)
 
-    logging.info("Running WasmScore test ... ")
 
-    wasmscore_summary_df = None
-    for suite in [
-        "ai-wasmscore",
-        "app-wasmscore",
-        "core-wasmscore",
-        "crypto-wasmscore",
-        "regex-wasmscore",
-    ]:
-        suite_summary_df = run_suites(suite, not ARGS_DICT["no_native"])
-        if isinstance(suite_summary_df, pd.DataFrame):
-            wasmscore_summary_df = pd.concat([wasmscore_summary_df, suite_summary_df])
+def get_distributed_work():
+    """Benchmarks to distribute, with whether to run them natively, and the
+    suites to score, from the --benchmarks, --suites or --tests selection"""
+    if ARGS_DICT["benchmarks"]:
+        return [
+            (benchmark, ARGS_DICT["native"])
+            for benchmark in ARGS_DICT["benchmarks"]
+            if benchmark in sg_benchmarks_wasm
+        ], []
+    if ARGS_DICT["suites"]:
+        suites = [suite for suite in ARGS_DICT["suites"] if suite in perf_suites]
+        run_native = ARGS_DICT["native"]
+    else:
+        suites = WASMSCORE_SUITES
+        run_native = not ARGS_DICT["no_native"]
+    benchmarks = dict.fromkeys(
+        benchmark for suite in suites for benchmark in perf_suites[suite]
+    )
+    return [(benchmark, run_native) for benchmark in benchmarks], suites
 
-    if isinstance(wasmscore_summary_df, pd.DataFrame):
-        print_verbose("")
-        print_verbose(
-            colored(
-                wasmscore_summary_df.reset_index(drop=True), "green", attrs=["bold"]
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    """Serves one worker: hands it the benchmarks queued for its host group, one
+    at a time as it becomes idle, and collects the results. Benchmarks held by a
+    worker that disconnects go back to its group's queue for the other workers,
+    or are failed when the group has no workers left"""
+
+    def handle(self):
+
+        import pandas as pd
+
+        state = self.server.state
+        register = receive_message(self.rfile)
+        with state["lock"]:
+            group = state["groups"].setdefault(
+                register["host"],
+                {
+                    "queue": collections.deque(state["work"]),
+                    "in_flight": set(),
+                    "results": [],
+                    "failed": [],
+                    "workers": [],
+                    "joined": [],
+                },
             )
+            group["workers"].append(register["name"])
+            group["joined"].append(register["name"])
+            state["changed"].notify_all()
+        print_verbose(
+            f"Worker {register['name']} joined host group {register['host']}."
+        )
+        send_message(
+            self.wfile,
+            {
+                "type": "settings",
+                "args": {setting: ARGS_DICT[setting] for setting in WORKER_SETTINGS},
+                "engines": WASM_ENGINES,
+                "processes": DEFAULT_BENCH_PROCESS_NUM,
+            },
         )
-        print_verbose("")
 
-        if "efficiency" in wasmscore_summary_df:
-            print(
-                colored(
-                    "Wasm Efficiency Score (Higher Better): {:.2f}".format(
-                        wasmscore_summary_df.loc[:, "efficiency"].mean()
-                    ),
-                    "green",
-                    attrs=["bold"],
+        item = None
+        try:
+            while True:
+                with state["lock"]:
+                    # Wait while other workers of the group may still hand back work
+                    while not group["queue"] and group["in_flight"]:
+                        state["changed"].wait()
+                    if not group["queue"]:
+                        break
+                    item = group["queue"].popleft()
+                    group["in_flight"].add(item)
+                send_message(
+                    self.wfile, {"type": "run", "benchmark": item[0], "native": item[1]}
                 )
-            )
+                reply = receive_message(self.rfile)
+                with state["lock"]:
+                    group["in_flight"].discard(item)
+                    if reply["type"] == "result":
+                        group["results"].append(reply["records"])
+                        stream_results(
+                            pd.DataFrame(reply["records"]).assign(host=register["host"])
+                        )
+                    else:
+                        print(
+                            f"{item[0]} failed on {register['name']}: {reply['error']}"
+                        )
+                        group["failed"].append(item[0])
+                    item = None
+                    state["changed"].notify_all()
+            send_message(self.wfile, {"type": "done"})
+        except (ConnectionError, OSError, ValueError) as error:
+            print(f"Lost worker {register['name']}: {error}")
+            with state["lock"]:
+                if item:
+                    group["in_flight"].discard(item)
+                    group["queue"].appendleft(item)
+        finally:
+            with state["lock"]:
+                group["workers"].remove(register["name"])
+                if not group["workers"] and group["queue"]:
+                    print(
+                        f"No workers left in host group {register['host']}, "
+                        f"failing {len(group['queue'])} benchmark(s)"
+                    )
+                    group["failed"].extend(queued[0] for queued in group["queue"])
+                    group["queue"].clear()
+                state["changed"].notify_all()
 
-        print(
-            colored(
-                "Wasm Execution Score (Higher Better): {:.2f}".format(
-                    1
-                    / geo_mean_overflow(wasmscore_summary_df.loc[:, "time"])
-                    * WASMSCORE_CONSTANT
-                ),
-                "green",
-                attrs=["bold"],
+
+def run_coordinator(address):
+    """Coordinator mode. Serves the selected benchmarks to workers connecting over
+    TCP and, once at least --min-workers have joined and every host group is
+    done, reports the results and scores of each host group. Each group runs the
+    whole selection so scores never mix results from non-identical hosts"""
+
+    work, suites = get_distributed_work()
+    state = {
+        "work": work,
+        "groups": {},
+        "lock": threading.Lock(),
+    }
+    state["changed"] = threading.Condition(state["lock"])
+
+    server = socketserver.ThreadingTCPServer(
+        parse_address(address, default_host=""), WorkerHandler
+    )
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print_verbose(
+        f"Coordinating {len(work)} benchmarks on {address}, "
+        f"waiting for {ARGS_DICT['min_workers']} worker(s)."
+    )
+
+    with state["lock"]:
+        while not (
+            sum(len(group["joined"]) for group in state["groups"].values())
+            >= ARGS_DICT["min_workers"]
+            and all(
+                not group["queue"] and not group["in_flight"]
+                for group in state["groups"].values()
             )
+        ):
+            state["changed"].wait()
+        groups = dict(state["groups"])
+    server.shutdown()
+    server.server_close()
+
+    for host, group in groups.items():
+        report_host_group(host, group, suites)
+
+
+def report_host_group(host, group, suites):
+    """Prints the merged results of one host group and, for suites, its scores"""
+
+    import pandas as pd
+    from termcolor import colored
+
+    print("")
+    print(
+        colored(f"Host {host}: {', '.join(group['joined'])}", "green", attrs=["bold"])
+    )
+    if group["failed"]:
+        print(f"Failed benchmarks: {', '.join(group['failed'])}")
+    if not group["results"]:
+        return
+    results_df = pd.concat(pd.DataFrame(records) for records in group["results"])
+    results_df.insert(0, "host", host)
+
+    if not suites:
+        BENCHMARK_DF.append(results_df)
+        print(results_df.to_string(index=False))
+        return
+
+    host_summary_df = None
+    for suite in suites:
+        suite_df = results_df[results_df["benchmark"].isin(perf_suites[suite])].copy()
+        if suite_df.empty:
+            continue
+        suite_summary_df = pd.concat(
+            [
+                summarize_suite_engine(suite, suite_df, engine)
+                for engine in suite_df["engine"].unique()
+                if engine != "Native"
+            ]
         )
+        suite_summary_df.insert(0, "host", host)
+        host_summary_df = pd.concat([host_summary_df, suite_summary_df])
+        suite_df.insert(1, "suite", suite)
+        SUITE_DF.append(suite_df)
+
+    if isinstance(host_summary_df, pd.DataFrame):
+        print(host_summary_df.to_string(index=False))
         print("")
+        for engine, engine_summary_df in host_summary_df.groupby("engine", sort=False):
+            print_engine_scores(engine, engine_summary_df)
 
 
-def run_simdscore():
-    """SimdScore test: Benchmarks scalar and simd version of select benchmarks and
-    reports a Wasm's scalar and simd performance score based on a geo-mean of
-    the performances of the benchmarks. The test also reports a Wasm simd efficiency
-    score calculated using Wasm's simd speed-up relative to native."""
-    logging.info("Running SimdScore test ...")
+def run_worker(address):
+    """Worker mode. Registers with a coordinator under this host's fingerprint,
+    adopts its settings and engines, then runs the benchmarks it hands out until
+    told the work is done"""
 
-    simdscore_summary_df = None
-    for suite in [
-        "scalar-simdscore",
-        "simd-simdscore",
-    ]:
-        #suite_summary_df = run_suites(suite, not ARGS_DICT["no_native"])
-        suite_summary_df = run_suites(suite, False)
-        if isinstance(suite_summary_df, pd.DataFrame):
-            simdscore_summary_df = pd.concat([simdscore_summary_df, suite_summary_df])
+    global WASM_ENGINES, DEFAULT_BENCH_PROCESS_NUM
 
-    if isinstance(simdscore_summary_df, pd.DataFrame):
-        print_verbose("")
-        print_verbose(
-            colored(
-                simdscore_summary_df.reset_index(drop=True).to_string(index=False), "green", attrs=["bold"]
+    with socket.create_connection(parse_address(address)) as connection:
+        stream = connection.makefile("rwb")
+        send_message(
+            stream,
+            {
+                "type": "register",
+                "host": get_host_fingerprint(),
+                "name": platform.node(),
+            },
+        )
+        settings = receive_message(stream)
+        ARGS_DICT.update(settings["args"])
+        WASM_ENGINES = settings["engines"]
+        DEFAULT_BENCH_PROCESS_NUM = settings["processes"]
+        print_verbose(f"Registered with coordinator {address}.")
+
+        while True:
+            message = receive_message(stream)
+            if message["type"] == "done":
+                break
+            try:
+                benchmark_df = run_benchmarks(message["benchmark"], message["native"])
+            except (Exception, SystemExit) as error:
+                send_message(stream, {"type": "error", "error": repr(error)})
+                continue
+            if benchmark_df is None:
+                send_message(
+                    stream,
+                    {
+                        "type": "error",
+                        "error": FAILED_BENCHMARKS[message["benchmark"]],
+                    },
+                )
+                continue
+            send_message(
+                stream, {"type": "result", "records": benchmark_df.to_dict("records")}
             )
+
+
+def get_build_version():
+    """Image version recorded in config.inc, e.g. v0.2.0.2497a1f"""
+    with open("config.inc", encoding="utf-8") as config:
+        for line in config:
+            if line.startswith("IMAGE_VERSION"):
+                return line.split('"')[1]
+    return ""
+
+
+def get_build_sha():
+    """Build sha recorded in config.inc, e.g. 2497a1f for v0.2.0.2497a1f"""
+    return get_build_version().split(".")[-1]
+
+
+def get_calculated_build_sha():
+    """In-process equivalent of hashing the build the way build.sh does:
+
+        find . -type f -name '*.wasm' | sort -d |
+            xargs -I{} sha1sum add_time_metric.diff ... wasmscore.py {} | sha1sum
+
+    File digests come from the hash cache, so only changed files are re-read"""
+
+    wasm_paths = []
+    for root, _, files in os.walk("."):
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith(".wasm") and not os.path.islink(path):
+                wasm_paths.append(path)
+    # sort -d (C locale): compare only blanks and alphanumerics, then whole lines
+    wasm_paths.sort(
+        key=lambda path: (
+            "".join(c for c in path if c in " \t" or (c.isascii() and c.isalnum())),
+            path,
         )
-        print_verbose("")
+    )
 
+    build_lines = "".join(
+        f"{hash_artifact(path, 'sha1')}  {path}\n"
+        for path in BUILD_SHA_FILES
+        if hash_artifact(path, "sha1")
+    )
+    sha_order = "".join(
+        build_lines + f"{hash_artifact(path, 'sha1')}  {path}\n" for path in wasm_paths
+    )
+    return hashlib.sha1(sha_order.encode()).hexdigest()[:7]
 
-def run_quickrun_wasmscore():
-    """SimdScore test: Benchmarks scalar and simd version of select benchmarks and
-    reports a Wasm's scalar and simd performance score based on a geo-mean of
-    the performances of the benchmarks. The test also reports a Wasm simd efficiency
-    score calculated using Wasm's simd speed-up relative to native."""
-    logging.info("Running QuickRun-WasmScore ...")
-    global DEFAULT_BENCH_PROCESS_NUM
-    DEFAULT_BENCH_PROCESS_NUM = 1
-    run_wasmscore()
 
+def open_history_db():
+    """Opens the history database, creating its table and indices on first use"""
+    os.makedirs(
+        os.path.dirname(os.path.abspath(ARGS_DICT["history_db"])), exist_ok=True
+    )
+    connection = sqlite3.connect(ARGS_DICT["history_db"])
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS results ("
+        "run_id TEXT, timestamp TEXT, build_sha TEXT, host TEXT, engine_hash TEXT, "
+        "benchmark TEXT, arch TEXT, engine TEXT, phase TEXT, mean REAL)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS results_benchmark_phase_timestamp "
+        "ON results (benchmark, phase, timestamp)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS results_timestamp ON results (timestamp)"
+    )
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(results)")]
+    if "metric" not in columns:
+        # Results recorded before --metric existed are all nanoseconds
+        connection.execute(
+            "ALTER TABLE results ADD COLUMN metric TEXT DEFAULT 'nanoseconds'"
+        )
+    return connection
 
-def run_quickrun_simdscore():
-    """SimdScore test: Benchmarks scalar and simd version of select benchmarks and
-    reports a Wasm's scalar and simd performance score based on a geo-mean of
-    the performances of the benchmarks. The test also reports a Wasm simd efficiency
-    score calculated using Wasm's simd speed-up relative to native."""
 
-    logging.info("Running QuickRun-SimdScore ...")
-    global DEFAULT_BENCH_PROCESS_NUM
-    DEFAULT_BENCH_PROCESS_NUM = 1
-    run_simdscore()
+def record_history(results_df):
+    """Appends a run's benchmark results to the history database, tagged with
+    the run id, build sha, host fingerprint, engine hash and timestamp. Results
+    replayed from the result cache were recorded by the run that measured them,
+    and are left out"""
 
+    import pandas as pd
 
-def run_quickrun_all():
-    """SimdScore test: Benchmarks scalar and simd version of select benchmarks and
-    reports a Wasm's scalar and simd performance score based on a geo-mean of
-    the performances of the benchmarks. The test also reports a Wasm simd efficiency
-    score calculated using Wasm's simd speed-up relative to native."""
+    history_df = results_df
+    if "cached" in history_df:
+        history_df = history_df[~history_df["cached"].eq(True)]
+        history_df = history_df.drop(columns="cached")
+    if history_df.empty:
+        return
+    history_df = history_df.copy()
+    history_df.insert(0, "run_id", RUN_ID)
+    history_df.insert(1, "timestamp", RUN_TIMESTAMP)
+    history_df.insert(2, "build_sha", get_build_sha())
+    history_df.insert(3, "host", get_host_fingerprint())
+    history_df.insert(
+        4,
+        "engine_hash",
+        history_df["engine"].map(
+            lambda engine: hash_artifact(get_engine_path(engine))[:12]
+        ),
+    )
+    history_df.insert(5, "metric", ARGS_DICT["metric"])
 
-    logging.info("Running QuickRun-All ...")
-    global DEFAULT_BENCH_PROCESS_NUM
-    DEFAULT_BENCH_PROCESS_NUM = 1
-    for bench in sg_benchmarks_native.keys():
-        run_benchmarks(bench, True)
-    for bench in sg_benchmarks_wasm.keys():
-        if bench not in sg_benchmarks_native:
-            run_benchmarks(bench, False)
+    connection = open_history_db()
+    with connection:
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(results)")]
+        for column in history_df.columns:
+            if column not in columns:
+                column_type = (
+                    "REAL"
+                    if pd.api.types.is_numeric_dtype(history_df[column])
+                    else "TEXT"
+                )
+                connection.execute(
+                    f'ALTER TABLE results ADD COLUMN "{column}" {column_type}'
+                )
+        if ARGS_DICT["resume"]:
+            # A resumed run replaces what it recorded before being interrupted
+            connection.execute("DELETE FROM results WHERE run_id = ?", (RUN_ID,))
+        history_df.to_sql("results", connection, if_exists="append", index=False)
+    connection.close()
+    logging.info("Recorded %d results in %s", len(history_df), ARGS_DICT["history_db"])
+
+
+def print_history(benchmarks):
+    """Prints the stored results of the given benchmarks over the most recent runs"""
+
+    import pandas as pd
+    from termcolor import colored
+
+    connection = open_history_db()
+    for benchmark in benchmarks:
+        history_df = pd.read_sql_query(
+            "SELECT timestamp, run_id, build_sha, host, engine, engine_hash, mean "
+            "FROM results WHERE benchmark = ? AND phase = ? AND metric = ? "
+            "AND run_id IN (SELECT run_id FROM results WHERE benchmark = ? "
+            "AND phase = ? AND metric = ? "
+            "GROUP BY run_id ORDER BY MAX(timestamp) DESC LIMIT ?) "
+            "ORDER BY timestamp, engine",
+            connection,
+            params=[
+                benchmark,
+                ARGS_DICT["history_phase"],
+                ARGS_DICT["metric"],
+                benchmark,
+                ARGS_DICT["history_phase"],
+                ARGS_DICT["metric"],
+                ARGS_DICT["history_runs"],
+            ],
+        )
+        print("")
+        print(
+            colored(
+                f"{benchmark} {ARGS_DICT['history_phase']} history "
+                f"({ARGS_DICT['metric']})",
+                "green",
+                attrs=["bold"],
+            )
+        )
+        if history_df.empty:
+            print("No results recorded")
+        else:
+            print(history_df.to_string(index=False))
+    print("")
+    connection.close()
+
+
+def export_history(export_path):
+    """Exports the whole history database to a columnar .parquet or a .csv file"""
+
+    import pandas as pd
+
+    connection = open_history_db()
+    history_df = pd.read_sql_query(
+        "SELECT * FROM results ORDER BY timestamp", connection
+    )
+    connection.close()
+    if export_path.endswith(".parquet"):
+        try:
+            history_df.to_parquet(export_path, index=False)
+        except ImportError:
+            print("Parquet export requires pyarrow or fastparquet to be installed")
+            sys.exit(1)
+    else:
+        history_df.to_csv(export_path, index=False)
+    print(f"Exported {len(history_df)} results to {export_path}")
 
 
 def print_verbose(string):
@@ -890,39 +4502,16 @@ def print_verbose(string):
     if not ARGS_DICT["quiet"]:
         print(string)
 
+
 def check_version():
     """Check the version of the sightglass-cli"""
 
-    build_version = subprocess.check_output(
-        "grep 'IMAGE_VERSION' config.inc | cut -d '\"' -f 2 ",
-        shell=True,
-        text=True,
-        stderr=subprocess.STDOUT,
-    ).strip()
+    build_version = get_build_version()
     print(f"Version: {build_version}")
 
-    build_sha = subprocess.check_output(
-        "grep 'IMAGE_VERSION' config.inc | cut -d '\"' -f 2 | cut -c 2- | cut -d '.' -f 4",
-        shell=True,
-        text=True,
-        stderr=subprocess.STDOUT,
-    ).strip()
-
-    print_order = subprocess.check_output(
-        "find . -type f -name '*.wasm' | sort -d | xargs -I{} sha1sum add_time_metric.diff build.sh requirements.txt Dockerfile wasmscore.py {}",
-        shell=True,
-        text=True,
-        stderr=subprocess.STDOUT,
-    ).strip()
-
-    #print(f"Sha Order:\n{print_order}")
-
-    calculated_build_sha = subprocess.check_output(
-        "find . -type f -name '*.wasm' | sort -d | xargs -I{} sha1sum add_time_metric.diff build.sh requirements.txt Dockerfile wasmscore.py {} | sha1sum | cut -c 1-7 | awk '{print $1}'",
-        shell=True,
-        text=True,
-        stderr=subprocess.STDOUT,
-    ).strip()
+    build_sha = get_build_sha()
+    calculated_build_sha = get_calculated_build_sha()
+    save_hash_cache()
     if (build_sha == calculated_build_sha):
         print(f"Build sha: {build_sha} vs {calculated_build_sha} (calculated) (run is valid)")
     else:
@@ -933,6 +4522,9 @@ def check_version():
 
 def main():
     """Top level entry"""
+    if ARGS_DICT["stream"] == "-":
+        reserve_stdout_for_stream()
+
     print_verbose("")
     print_verbose("WasmScore")
     check_version()
@@ -941,7 +4533,49 @@ def main():
         print("")
         return
 
+    load_engine_registry()
+
+    if ARGS_DICT["resume"]:
+        global RUN_ID
+        RUN_ID = ARGS_DICT["resume"]
+        load_journal(RUN_ID)
+
+    if ARGS_DICT["throughput"] and ARGS_DICT["jobs"] > 1:
+        print("--throughput needs every core and cannot be combined with --jobs")
+        sys.exit(1)
+
+    if ARGS_DICT["time_budget"] and len(WASM_ENGINES) > 1:
+        print("--time-budget predicts the score of a single engine")
+        sys.exit(1)
+
+    # The time budget is planned from the history of run times in nanoseconds
+    if ARGS_DICT["time_budget"] and ARGS_DICT["metric"] != "nanoseconds":
+        print("--time-budget needs --metric nanoseconds")
+        sys.exit(1)
+
+    if ARGS_DICT["profile"] and not shutil.which("perf"):
+        print("--profile requires perf to be installed")
+        sys.exit(1)
+
+    if ARGS_DICT["compare"]:
+        compare_results(*ARGS_DICT["compare"])
+        return
+
+    if ARGS_DICT["clear_cache"]:
+        clear_result_cache()
+        return
+
+    if ARGS_DICT["history"]:
+        print_history(ARGS_DICT["history"])
+        return
+
+    if ARGS_DICT["history_export"]:
+        export_history(ARGS_DICT["history_export"])
+        return
+
     if ARGS_DICT["list"]:
+        import yaml
+
         print("")
         print("Tests\n------")
         print(yaml.dump(perf_tests, sort_keys=True, default_flow_style=False))
@@ -949,15 +4583,28 @@ def main():
         print(yaml.dump(perf_suites, sort_keys=True, default_flow_style=False))
         return
 
-    if ARGS_DICT["benchmarks"]:
+    if ARGS_DICT["coordinate"]:
+        run_coordinator(ARGS_DICT["coordinate"])
+    elif ARGS_DICT["worker"]:
+        run_worker(ARGS_DICT["worker"])
+    elif ARGS_DICT["sweep"]:
+        run_sweep()
+    elif ARGS_DICT["time_budget"]:
+        run_time_budget(ARGS_DICT["time_budget"])
+    elif ARGS_DICT["scaling"]:
+        for benchmark in ARGS_DICT["scaling"]:
+            if benchmark in SCALING_INPUTS:
+                run_scaling(benchmark)
+            else:
+                print(f"Benchmark {benchmark} does not read an input file")
+    elif ARGS_DICT["benchmarks"]:
+        benchmark_list = []
         for benchmark in ARGS_DICT["benchmarks"]:
             if benchmark in sg_benchmarks_wasm:
-                if ARGS_DICT["native"]:
-                    run_benchmarks(benchmark, True)
-                else:
-                    run_benchmarks(benchmark)
+                benchmark_list.append((benchmark, ARGS_DICT["native"]))
             else:
                 print(f"Benchmark {benchmark} is not valid")
+        run_benchmark_list(benchmark_list)
     elif ARGS_DICT["suites"]:
         for suite in ARGS_DICT["suites"]:
             if suite in perf_suites:
@@ -979,26 +4626,51 @@ def main():
                 run_quickrun_simdscore()
             elif test.lower() == "quickrun_all":
                 run_quickrun_all()
+            elif test.lower() == "coldstart":
+                run_coldstart()
             else:
                 print(f"Test {test} is not valid")
     else:
         run_quickrun_wasmscore()
 
     if ARGS_DICT["dump"]:
-        if isinstance(SUITE_DF, pd.DataFrame):
+        if SUITE_DF:
+            print("")
+            print(SUITE_DF.to_frame().to_string(index=False))
+            print("")
+        elif BENCHMARK_DF:
+            print("")
+            print(BENCHMARK_DF.to_frame().to_string(index=False))
             print("")
-            print(SUITE_DF.to_string(index=False))
+        if THROUGHPUT_DF:
+            print(THROUGHPUT_DF.to_frame().to_string(index=False))
             print("")
-        elif isinstance(BENCHMARK_DF, pd.DataFrame):
+        if SCALING_DF:
+            print(SCALING_DF.to_frame().to_string(index=False))
             print("")
-            print(BENCHMARK_DF.to_string(index=False))
+        if COLDSTART_DF:
+            print(COLDSTART_DF.to_frame().to_string(index=False))
             print("")
 
     if ARGS_DICT["dumpfile"]:
-        if isinstance(SUITE_DF, pd.DataFrame):
-            SUITE_DF.to_csv(ARGS_DICT["dumpfile"], sep=",", index=False)
-        elif isinstance(BENCHMARK_DF, pd.DataFrame):
-            BENCHMARK_DF.to_csv(ARGS_DICT["dumpfile"], sep=",", index=False)
+        if SUITE_DF:
+            SUITE_DF.to_frame().to_csv(ARGS_DICT["dumpfile"], sep=",", index=False)
+        elif BENCHMARK_DF:
+            BENCHMARK_DF.to_frame().to_csv(ARGS_DICT["dumpfile"], sep=",", index=False)
+
+    # Workers record their own results, under their own host fingerprint
+    if not ARGS_DICT["no_history"] and not ARGS_DICT["coordinate"] and BENCHMARK_DF:
+        record_history(BENCHMARK_DF.to_frame())
+
+    save_hash_cache()
+
+    if FAILED_BENCHMARKS:
+        print_failed_benchmarks()
+        if os.path.isfile(os.path.join(JOURNAL_DIR, f"{RUN_ID}.jsonl")):
+            print(f"Resume the run with --resume {RUN_ID}")
+        sys.exit(1)
+
+    remove_journal()
 
 
 if __name__ == "__main__":